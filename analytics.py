@@ -0,0 +1,310 @@
+# analytics.py
+# (YYYY-MM-DD): 2026-10-19 - Streaming analytics over game event streams (bounded-memory aggregates, reports)
+# (YYYY-MM-DD): 2026-10-19 - T-spin, combo, back-to-back and perfect-clear counts from 'clear' events
+
+import argparse
+import json
+import math
+import os
+from collections import Counter
+from config import *
+
+# Every aggregate below keeps O(1) or O(log range) state, can be merged with another instance of the
+# same kind (for per-process batches) and never holds the events themselves.
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # Sum of squared deviations (Welford)
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        stddev = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {'count': self.count, 'mean': self.mean, 'stddev': stddev, 'min': self.min, 'max': self.max}
+
+
+class Histogram:
+    """Fixed-width bins; memory grows with the value range / bin_width, not with the number of values."""
+    def __init__(self, bin_width=1):
+        self.bin_width = bin_width
+        self.bins = Counter()
+
+    def add(self, value):
+        self.bins[int(value // self.bin_width)] += 1
+
+    def merge(self, other):
+        self.bins.update(other.bins)
+
+    def summary(self):
+        return {f"{b * self.bin_width}-{(b + 1) * self.bin_width - 1}" if self.bin_width > 1 else str(b): count
+                for b, count in sorted(self.bins.items())}
+
+
+class QuantileSketch:
+    """Relative-error quantiles over non-negative values using logarithmic buckets (DDSketch style).
+
+    Any quantile is returned within `relative_accuracy` of a true value; memory is one counter per
+    occupied bucket, about 1000 buckets to span 1 to 1e9 at 1%.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        return {f"p{round(q * 100)}": self.quantile(q) for q in quantiles}
+
+
+def kick_entry_name(piece_name, rotation_key, kick_index):
+    """e.g. 'KICK_DATA_JLSTZ[(0, 1)][2] (-1, -1)', or '... failed' when no kick test fitted."""
+    table_name, table = ('KICK_DATA_I', KICK_DATA_I) if piece_name == 'I' else ('KICK_DATA_JLSTZ', KICK_DATA_JLSTZ)
+    if kick_index is None:
+        return f"{table_name}[{rotation_key}] failed"
+    kick_tests = table.get(rotation_key, [(0, 0)])
+    return f"{table_name}[{rotation_key}][{kick_index}] {kick_tests[kick_index]}"
+
+
+class GameAnalytics:
+    """Consumes event streams (see game.py and simulate.py) in a single pass with bounded memory."""
+    def __init__(self):
+        self.games = 0
+        self.truncated = 0 # Games stopped by the simulator's piece limit rather than topping out
+        self.events = 0
+        self.lines_per_game = Histogram(bin_width=10)
+        self.lines_per_game_quantiles = QuantileSketch()
+        self.lines_per_game_stats = RunningStats()
+        self.score_quantiles = QuantileSketch()
+        self.clears = Counter() # lines cleared at once (1-4) -> count
+        self.time_to_top_out = QuantileSketch() # Game time (ms of gravity) until game over
+        self.time_per_level = {} # level -> QuantileSketch of game time spent at that level
+        self.kick_usage = Counter() # (piece_name, rotation_key, kick_index) -> count
+        self.clear_kinds = Counter() # 'clear' event kind ('tetris', 't_spin_double', ...) -> count
+        self.combo_depths = Counter() # Deepest combo of a chain of 2+ clearing locks -> number of chains
+        self.back_to_back = 0
+        self.perfect_clears = 0
+        # Per-game cursor, reset on 'game_start'
+        self._game_time = 0
+        self._level = 1
+        self._level_started = 0
+        self._combo = 0
+
+    def consume(self, events):
+        """Folds an iterable/generator of event tuples into the aggregates; returns self."""
+        for event in events:
+            self.events += 1
+            kind = event[0]
+            if kind == 'fall':
+                self._game_time += event[1]
+            elif kind == 'rotate':
+                self.kick_usage[event[1:]] += 1
+            elif kind == 'lock':
+                if event[2]:
+                    self.clears[event[2]] += 1
+                elif self._combo:
+                    self._record_combo()
+            elif kind == 'clear':
+                self.clear_kinds[event[1]] += 1
+                self.back_to_back += event[3]
+                self.perfect_clears += event[5]
+                if event[2]: # A line-clearing lock continues (or starts) the combo chain
+                    self._combo = event[4]
+                elif self._combo:
+                    self._record_combo()
+            elif kind == 'level_up':
+                self._record_level_time()
+                self._level = event[1]
+            elif kind == 'game_over':
+                self._finish_game(event[1], event[2])
+                self.time_to_top_out.add(self._game_time)
+            elif kind == 'truncated': # Cut short by the simulator: counts as a game, not as a top-out
+                self._finish_game(event[1], event[2])
+                self.truncated += 1
+            elif kind == 'game_start':
+                self._game_time = 0
+                self._level = 1
+                self._level_started = 0
+                self._combo = 0
+        return self
+
+    def _record_combo(self):
+        self.combo_depths[self._combo] += 1
+        self._combo = 0
+
+    def _finish_game(self, score, lines):
+        if self._combo:
+            self._record_combo()
+        self._record_level_time()
+        self.games += 1
+        self.lines_per_game.add(lines)
+        self.lines_per_game_quantiles.add(lines)
+        self.lines_per_game_stats.add(lines)
+        self.score_quantiles.add(score)
+
+    def _record_level_time(self):
+        sketch = self.time_per_level.get(self._level)
+        if sketch is None:
+            sketch = self.time_per_level[self._level] = QuantileSketch()
+        sketch.add(self._game_time - self._level_started)
+        self._level_started = self._game_time
+
+    def merge(self, other):
+        self.games += other.games
+        self.truncated += other.truncated
+        self.events += other.events
+        self.lines_per_game.merge(other.lines_per_game)
+        self.lines_per_game_quantiles.merge(other.lines_per_game_quantiles)
+        self.lines_per_game_stats.merge(other.lines_per_game_stats)
+        self.score_quantiles.merge(other.score_quantiles)
+        self.clears.update(other.clears)
+        self.time_to_top_out.merge(other.time_to_top_out)
+        for level, sketch in other.time_per_level.items():
+            if level in self.time_per_level:
+                self.time_per_level[level].merge(sketch)
+            else:
+                self.time_per_level[level] = sketch
+        self.kick_usage.update(other.kick_usage)
+        self.clear_kinds.update(other.clear_kinds)
+        self.combo_depths.update(other.combo_depths)
+        self.back_to_back += other.back_to_back
+        self.perfect_clears += other.perfect_clears
+        return self
+
+    def tetris_rate(self):
+        """Share of all cleared lines that came from 4-line clears."""
+        total_lines = sum(lines * count for lines, count in self.clears.items())
+        return 4 * self.clears[4] / total_lines if total_lines else 0.0
+
+    def summary(self):
+        levels = {}
+        for level in sorted(self.time_per_level):
+            # Fall delay the level runs at: INITIAL_FALL_DELAY * SPEED_MULTIPLIER_PER_LEVEL^(level-1), floored
+            fall_delay = INITIAL_FALL_DELAY
+            for _ in range(level - 1):
+                fall_delay = max(MIN_FALL_DELAY, int(fall_delay * SPEED_MULTIPLIER_PER_LEVEL))
+            sketch = self.time_per_level[level]
+            levels[str(level)] = {'fall_delay_ms': fall_delay, 'samples': sketch.count, **sketch.summary()}
+        return {
+            'games': self.games,
+            'truncated_games': self.truncated,
+            'events': self.events,
+            'lines_per_game': {**self.lines_per_game_stats.summary(), **self.lines_per_game_quantiles.summary(),
+                               'histogram': self.lines_per_game.summary()},
+            'score': self.score_quantiles.summary(),
+            'clears': {str(lines): count for lines, count in sorted(self.clears.items())},
+            'tetris_rate': self.tetris_rate(),
+            'clear_kinds': dict(self.clear_kinds.most_common()),
+            'back_to_back': self.back_to_back,
+            'perfect_clears': self.perfect_clears,
+            'combo_depths': {str(depth): count for depth, count in sorted(self.combo_depths.items())},
+            'time_to_top_out_ms': self.time_to_top_out.summary(),
+            'time_per_level_ms': levels,
+            'kick_usage': {kick_entry_name(*key): count for key, count in self.kick_usage.most_common()},
+        }
+
+    def write_report(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def analyze_batch(seeds, noise=0.5, max_pieces=None):
+    """Simulates and analyzes a batch of games in this process (the unit of work for parallel runs)."""
+    from simulate import simulate_games # Deferred: workers and callers with their own streams skip the bot
+    return GameAnalytics().consume(simulate_games(seeds, noise, max_pieces))
+
+
+def analyze_simulated(games, first_seed=0, workers=1, batch_size=50, noise=0.5, max_pieces=None):
+    """Runs `games` simulated games across processes, merging per-batch aggregates as they finish."""
+    batches = (range(start, min(start + batch_size, first_seed + games))
+               for start in range(first_seed, first_seed + games, batch_size))
+    result = GameAnalytics()
+    if workers <= 1:
+        for seeds in batches:
+            result.merge(analyze_batch(seeds, noise, max_pieces))
+        return result
+
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for seeds in batches: # Keep a bounded window of batches in flight instead of queueing them all
+            in_flight.add(pool.submit(analyze_batch, seeds, noise, max_pieces))
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result.merge(future.result())
+        for future in in_flight:
+            result.merge(future.result())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Tetris games headlessly and report distributions.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--noise", type=float, default=0.5, help="Randomness added to the bot's placement scores")
+    parser.add_argument("--max-pieces", type=int, help="Stop each game after this many pieces")
+    parser.add_argument("--out", default="analytics_report.json")
+    args = parser.parse_args(argv)
+
+    result = analyze_simulated(args.games, args.first_seed, args.workers, args.batch_size, args.noise, args.max_pieces)
+    result.write_report(args.out)
+    summary = result.summary()
+    print(f"{summary['games']} games, {summary['events']} events -> {args.out}")
+    print(f"lines/game mean {summary['lines_per_game']['mean']:.1f}, tetris rate {summary['tetris_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
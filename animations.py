@@ -0,0 +1,212 @@
+# animations.py
+# (YYYY-MM-DD): 2026-10-19 - Frame timeline for line-clear flash, row collapse, lock glow and level-up banner
+
+import time
+from config import *
+from startup import lazy_import
+
+def _now_ms():
+    return time.perf_counter() * 1000
+
+def _ease_out(t):
+    return 1 - (1 - t) * (1 - t)
+
+def _fade_step(t):
+    """Fade level (0 = invisible .. ANIMATION_ALPHA_STEPS = opaque) for the remaining fraction 1 - t."""
+    return round((1 - min(max(t, 0.0), 1.0)) * ANIMATION_ALPHA_STEPS)
+
+
+class SpriteCache:
+    """Animation sprites rendered once per (kind, width/color, fade level) and reused by every frame."""
+    def __init__(self):
+        self.sprites = {}
+
+    def _alpha_surface(self, size, color, step):
+        pygame = lazy_import("pygame")
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        sprite.fill((*color, 255 * step // ANIMATION_ALPHA_STEPS))
+        return sprite
+
+    def row(self, width, color, step):
+        """A full-width translucent band one block high (line-clear flash)."""
+        key = ('row', width, color, step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self._alpha_surface((width, BLOCK_SIZE), color, step)
+        return sprite
+
+    def glow(self, color, step):
+        """A translucent block (lock glow)."""
+        key = ('glow', color, step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self._alpha_surface((BLOCK_SIZE, BLOCK_SIZE), color, step)
+        return sprite
+
+    def empty_row(self, width):
+        """An empty board row with its grid lines, as TetrisGame.draw() paints it."""
+        key = ('empty_row', width)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            pygame = lazy_import("pygame")
+            sprite = self.sprites[key] = pygame.Surface((width, BLOCK_SIZE))
+            sprite.fill(EMPTY_CELL_COLOR)
+            pygame.draw.line(sprite, GRID_COLOR, (0, 0), (width, 0))
+            for c in range(GRID_COLS):
+                pygame.draw.line(sprite, GRID_COLOR, (c * BLOCK_SIZE, 0), (c * BLOCK_SIZE, BLOCK_SIZE))
+        return sprite
+
+    def cell(self, color):
+        """A filled block with its darker border, as TetrisGame.draw() paints it."""
+        key = ('cell', color)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            pygame = lazy_import("pygame")
+            sprite = self.sprites[key] = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE))
+            sprite.fill(color)
+            pygame.draw.rect(sprite, tuple(max(0, comp-50) for comp in color), (0, 0, BLOCK_SIZE, BLOCK_SIZE), 1)
+        return sprite
+
+    def banner(self, level):
+        key = ('banner', level)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            pygame = lazy_import("pygame")
+            if not pygame.font.get_init():
+                pygame.font.init()
+            sprite = self.sprites[key] = pygame.font.Font(None, 48).render(f"LEVEL {level}", True, WHITE)
+        return sprite
+
+
+class AnimationTimeline:
+    """Cosmetic animations layered over TetrisGame.draw() output, driven by game events and the clock.
+
+    The game commits every lock, clear and level-up at once and never waits. The timeline only records
+    what happened and when; draw() then rebuilds the in-between picture for the current time: cleared
+    rows flash in place, the rows above slide down to where the board already has them, the locked cells
+    glow and a level-up banner fades out. A newer lock replaces a running clear animation, so the picture
+    never trails the committed board by more than one clear. Bands of moving rows are rendered once per
+    clear and every other sprite once per size and fade level, so a frame costs a few dozen blits.
+    """
+    def __init__(self, game, enabled=ANIMATIONS_ENABLED, clock=_now_ms):
+        self.game = game
+        self.enabled = enabled
+        self.clock = clock # Milliseconds; injectable for deterministic rendering
+        self.sprites = SpriteCache()
+        self.clear_anim = None # [start_ms, cleared_rows, bands, band_rows], bands rendered on first draw
+        self.lock_anim = None # (start_ms, cells as (row, col, rows the cell drops with the collapse))
+        self.level_anim = None # (start_ms, level)
+        if enabled:
+            game.event_listeners.append(self.on_game_event)
+
+    def on_game_event(self, event):
+        kind = event[0]
+        if kind == 'lock':
+            _, _, lines, cells, cleared_rows = event
+            now = self.clock()
+            self.clear_anim = None
+            if lines:
+                # Runs of surviving rows between cleared rows: (old first row, row count, rows it drops).
+                # Their content is copied now, while the committed grid still matches this clear.
+                bands = []
+                start = 0
+                for index, cleared in enumerate(cleared_rows):
+                    if cleared > start:
+                        bands.append((start, cleared - start, len(cleared_rows) - index))
+                    start = cleared + 1
+                band_rows = [row[:] for row in self.game.grid[:cleared_rows[-1] + 1]]
+                self.clear_anim = [now, cleared_rows, bands, band_rows]
+            cleared = set(cleared_rows)
+            self.lock_anim = (now, tuple((r, c, sum(1 for row in cleared_rows if row > r))
+                                   for r, c in cells if r >= 0 and r not in cleared))
+        elif kind == 'level_up':
+            self.level_anim = (self.clock(), event[1])
+        elif kind == 'game_over':
+            self.clear()
+
+    def clear(self):
+        self.clear_anim = None
+        self.lock_anim = None
+        self.level_anim = None
+
+    def active(self):
+        return bool(self.clear_anim or self.lock_anim or self.level_anim)
+
+    def draw(self, surface):
+        """Overlays the running animations on a frame just drawn by TetrisGame.draw(); True while any runs."""
+        game = self.game
+        if not self.enabled or game.paused or game.game_over: # Nothing animates under the overlays
+            self.clear()
+            return False
+        now = self.clock()
+
+        collapse = 1.0 # Progress of the rows sliding down, 1.0 = committed positions
+        if self.clear_anim:
+            elapsed = now - self.clear_anim[0]
+            if elapsed >= LINE_CLEAR_FLASH_MS + ROW_COLLAPSE_MS:
+                self.clear_anim = None
+            else:
+                collapse = _ease_out(max(0.0, elapsed - LINE_CLEAR_FLASH_MS) / ROW_COLLAPSE_MS)
+                self._draw_clear(surface, collapse)
+
+        if self.lock_anim:
+            start, cells = self.lock_anim
+            step = _fade_step((now - start) / LOCK_FLASH_MS)
+            if not step:
+                self.lock_anim = None
+            else:
+                glow = self.sprites.glow(WHITE, step)
+                for r, c, drop in cells:
+                    surface.blit(glow, (c * BLOCK_SIZE, round((r + drop * collapse) * BLOCK_SIZE)))
+
+        if self.level_anim:
+            start, level = self.level_anim
+            t = (now - start) / LEVEL_UP_BANNER_MS
+            if t >= 1:
+                self.level_anim = None
+            else:
+                banner = self.sprites.banner(level)
+                banner.set_alpha(255 if t < 0.5 else round(255 * (1 - t) * 2)) # Hold, then fade out
+                rise = round(t * BLOCK_SIZE)
+                surface.blit(banner, ((surface.get_width() - banner.get_width()) // 2,
+                                      (surface.get_height() - banner.get_height()) // 2 - rise))
+
+        return self.active()
+
+    def _draw_clear(self, surface, collapse):
+        start, cleared_rows, bands, band_rows = self.clear_anim
+        width = surface.get_width()
+        if band_rows is not None: # First frame of this clear: render each moving band once
+            self.clear_anim[2] = bands = [(self._render_band(band_rows, first + drop, count, width), first, drop)
+                                          for first, count, drop in bands]
+            self.clear_anim[3] = None
+
+        # Everything from the top down to the lowest cleared row is repainted; rows below it never move
+        empty_row = self.sprites.empty_row(width)
+        for r in range(cleared_rows[-1] + 1):
+            surface.blit(empty_row, (0, r * BLOCK_SIZE))
+        step = _fade_step(collapse) # Full flash, then fades out while the rows collapse
+        if step:
+            flash = self.sprites.row(width, LINE_CLEAR_FLASH_COLOR, step)
+            for r in cleared_rows:
+                surface.blit(flash, (0, r * BLOCK_SIZE))
+        for band, first, drop in bands:
+            surface.blit(band, (0, round((first + drop * collapse) * BLOCK_SIZE)))
+
+        piece = self.game.current_piece # Repainted above: put the falling piece back on top
+        cell = self.sprites.cell(piece.color)
+        for r_abs, c_abs in piece.get_world_coords():
+            if 0 <= r_abs <= cleared_rows[-1]:
+                surface.blit(cell, (c_abs * BLOCK_SIZE, r_abs * BLOCK_SIZE))
+
+    def _render_band(self, band_rows, first_row, count, width):
+        """Renders committed rows first_row .. first_row + count - 1 into one surface."""
+        pygame = lazy_import("pygame")
+        band = pygame.Surface((width, count * BLOCK_SIZE))
+        empty_row = self.sprites.empty_row(width)
+        for i in range(count):
+            band.blit(empty_row, (0, i * BLOCK_SIZE))
+            for c, color in enumerate(band_rows[first_row + i]):
+                if color:
+                    band.blit(self.sprites.cell(color), (c * BLOCK_SIZE, i * BLOCK_SIZE))
+        return band
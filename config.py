@@ -1,8 +1,7 @@
 # config.py
 # (YYYY-MM-DD): 2025-05-10 - Configuration values for CTkTetris
 # (YYYY-MM-DD): 2025-05-11 - Added SRS-like kick data and reward thresholds
-
-import pygame
+# (YYYY-MM-DD): 2026-10-19 - Dropped unused pygame import (config is imported first at startup)
 
 # --- Screen and Game Area Dimensions ---
 WINDOW_WIDTH = 850  # Increased width slightly for rewards display
@@ -116,6 +115,16 @@ SCORE_PER_LINE = [0, 100, 300, 500, 800] # 0, 1, 2, 3, 4 (Tetris) lines
 SCORE_SOFT_DROP_PER_ROW = 1
 SCORE_HARD_DROP_PER_ROW = 2
 
+# Modern scoring (T-spins, combos, back-to-back, perfect clears). With MODERN_SCORING = False only
+# SCORE_PER_LINE applies; clears are still detected and reported to achievements and analytics.
+MODERN_SCORING = True
+SCORE_T_SPIN = [400, 800, 1200, 1600] # T-spin with 0, 1, 2, 3 lines
+SCORE_T_SPIN_MINI = [100, 200, 400] # T-spin mini with 0, 1, 2 lines
+SCORE_COMBO = 50 # Per combo step (consecutive clearing locks after the first), times level
+BACK_TO_BACK_MULTIPLIER = 1.5 # Tetris or line-clearing T-spin right after another one
+SCORE_PERFECT_CLEAR = [0, 800, 1200, 1800, 2000] # Bonus when a 1-4 line clear empties the board
+T_SPIN_UPGRADE_KICK_INDEX = 4 # A mini reached through this kick test (the last one) counts as a full T-spin
+
 # --- Pygame Surface for CTk integration ---
 PYGAME_SURFACE_WIDTH = GRID_COLS * BLOCK_SIZE
 PYGAME_SURFACE_HEIGHT = GRID_ROWS * BLOCK_SIZE
@@ -129,3 +138,45 @@ REWARD_THRESHOLDS = {
     10: "Level 10 Reached!" # This will be a level-based reward
 }
 LEVEL_REWARD_TRIGGER = 10
+
+# --- Score Store (scores.py) ---
+SCORE_STORE_DIR = "scores" # Holds scores.log (append-only records) and scores-*.seg (index segments)
+SCORE_INDEX_TOP_K = 1000 # Global best-scores kept in the index; top(n) raises ValueError for n above this
+SCORE_COMPACT_EVERY = 5000 # Appended records between background index checkpoints (one new segment each)
+SCORE_SEGMENT_MERGE_RATIO = 2 # Merge the two newest segments while the older is at most this times the newer
+SCORE_LOG_MAX_RECORDS = 5_000_000 # (0 = never) Past this the log is compacted to the records queries can still return:
+SCORE_LOG_KEEP_PER_PLAYER = 1000 # the global top-K plus this many best and this many latest games per player
+
+# --- Input Latency Tracing (latency.py) ---
+LATENCY_BUDGET_MS = 16 # One 60 Hz frame from key press to displayed frame
+LATENCY_SLOW_FRAMES_KEPT = 50 # Most recent over-budget frames kept for inspection
+
+# --- Versus Mode (versus.py) ---
+GARBAGE_COLOR = (110, 110, 110)
+VERSUS_MAX_PLAYERS = 8
+VERSUS_GARBAGE_FOR_LINES = [0, 0, 1, 2, 4] # Garbage rows sent for clearing 0, 1, 2, 3, 4 lines at once
+VERSUS_FRAME_MS = 16 # One shared clock tick (and at most one Tk push) per frame
+VERSUS_BOT_ACTION_MS = 120 # A bot makes one move every this many ms
+VERSUS_MAX_WINDOW = (1600, 900) # The shared surface is laid out to fit this size
+VERSUS_BOARD_GAP = 12
+VERSUS_HEADER_HEIGHT = 24
+
+# --- Clear-based achievements (keys of the 'clear' event, see game.py) ---
+CLEAR_REWARDS = {
+    't_spin': "T-Spin!",
+    'tetris': "Tetris!",
+    'back_to_back': "Back-to-Back!",
+    'perfect_clear': "Perfect Clear!",
+    'combo': "Combo x4!",
+}
+COMBO_REWARD_TRIGGER = 4
+
+# --- Animations (render layer only: game logic never waits for them) ---
+ANIMATIONS_ENABLED = True # main.py --no-animations; headless tools and benchmarks never create a timeline
+ANIMATION_FRAME_MS = 16 # Redraw interval while an animation is running
+LINE_CLEAR_FLASH_MS = 120 # Cleared rows flash in place...
+ROW_COLLAPSE_MS = 140 # ...then the rows above slide down into the gap
+LOCK_FLASH_MS = 100 # Glow over the cells of a piece that just locked
+LEVEL_UP_BANNER_MS = 900
+ANIMATION_ALPHA_STEPS = 8 # Pre-rendered fade levels per sprite
+LINE_CLEAR_FLASH_COLOR = WHITE
@@ -0,0 +1,99 @@
+# env.py
+# (YYYY-MM-DD): 2026-10-19 - Gym-style environment with zero-copy NumPy observations for learning agents
+# Requires numpy (not needed by the game itself): pip install numpy
+
+import numpy as np
+from config import *
+from game import TetrisGame, PIECE_IDS
+
+ACTIONS = ('noop', 'left', 'right', 'rotate', 'soft_drop', 'hard_drop') # Index = action passed to step()
+FEATURES = ('score', 'level', 'lines_cleared_total', 'fall_delay',
+            'piece_id', 'piece_x', 'piece_y', 'piece_rotation') # Order of TetrisObservation.features
+
+def _shape_offsets():
+    """Flat board offsets of every (shape, rotation), so the active mask is updated with one fancy index."""
+    return {(name, rotation_index): np.array([r * GRID_COLS + c for r, c in coords], dtype=np.intp)
+            for name, rotations in TETROMINO_SHAPES.items()
+            for rotation_index, coords in enumerate(rotations)}
+
+SHAPE_OFFSETS = _shape_offsets()
+
+
+class TetrisObservation:
+    """NumPy arrays describing a TetrisGame, all allocated once and updated in place by refresh().
+
+    `board` is a read-only view straight over TetrisGame.board (occupancy codes from PIECE_IDS), so it
+    is never copied. `active` (current piece mask), `preview` (next piece id) and `features` (see
+    FEATURES) are small arrays rewritten with a few vectorised assignments per refresh. Arrays returned
+    by `arrays` are the same objects every step: copy them if you need to keep a history.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.board = np.frombuffer(game.board, dtype=np.uint8).reshape(GRID_ROWS, GRID_COLS)
+        self.board.flags.writeable = False
+        self.active = np.zeros((GRID_ROWS, GRID_COLS), dtype=np.uint8)
+        self._active_flat = self.active.reshape(-1) # View, not a copy
+        self._active_cells = None # Offsets currently set in `active`
+        self.preview = np.zeros(1, dtype=np.uint8)
+        self.features = np.zeros(len(FEATURES), dtype=np.float32)
+        self.arrays = {'board': self.board, 'active': self.active, 'preview': self.preview, 'features': self.features}
+
+    def refresh(self):
+        game = self.game
+        piece = game.current_piece
+        if self._active_cells is not None:
+            self._active_flat[self._active_cells] = 0
+        cells = SHAPE_OFFSETS[(piece.name, piece.rotation_index)] + (piece.y * GRID_COLS + piece.x)
+        self._active_flat[cells] = 1
+        self._active_cells = cells
+        self.preview[0] = PIECE_IDS[game.next_piece.name]
+        self.features[:] = (game.score, game.level, game.lines_cleared_total, game.fall_delay,
+                            PIECE_IDS[piece.name], piece.x, piece.y, piece.rotation_index)
+        return self.arrays
+
+
+class TetrisEnv:
+    """Gym-style wrapper: reset(seed) -> (obs, info), step(action) -> (obs, reward, terminated, truncated, info).
+
+    The reward is the score gained during the step. Gravity applies one fall every `gravity_every` steps
+    (a hard drop already locks the piece), and `max_steps` truncates long episodes.
+    """
+    def __init__(self, gravity_every=1, max_steps=None):
+        self.game = TetrisGame()
+        self.observation = TetrisObservation(self.game)
+        self.gravity_every = gravity_every
+        self.max_steps = max_steps
+        self.steps = 0
+        self.action_count = len(ACTIONS)
+
+    def reset(self, seed=None):
+        self.game.reset_game(seed)
+        self.steps = 0
+        return self.observation.refresh(), self._info()
+
+    def step(self, action):
+        game = self.game
+        score_before = game.score
+        name = ACTIONS[action]
+        if name == 'left':
+            game.move(-1, 0)
+        elif name == 'right':
+            game.move(1, 0)
+        elif name == 'rotate':
+            game.rotate_piece()
+        elif name == 'soft_drop':
+            game.move(0, 1)
+        elif name == 'hard_drop':
+            game.hard_drop()
+
+        self.steps += 1
+        if name != 'hard_drop' and not game.game_over and self.steps % self.gravity_every == 0:
+            game.fall()
+
+        terminated = game.game_over
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        return self.observation.refresh(), game.score - score_before, terminated, truncated, self._info()
+
+    def _info(self):
+        return {'seed': self.game.seed, 'steps': self.steps, 'pieces_locked': self.game.pieces_locked,
+                'lines_cleared_total': self.game.lines_cleared_total}
@@ -1,10 +1,19 @@
 # game.py
 # (YYYY-MM-DD): 2025-05-10 - Core Tetris game logic
 # (YYYY-MM-DD): 2025-05-11 - Implemented SRS-like wall kicks, basic rewards tracking
+# (YYYY-MM-DD): 2026-10-19 - pygame imported lazily; surface, pause font and overlay built on first draw
+# (YYYY-MM-DD): 2026-10-19 - Seedable piece RNG, get_state/set_state snapshots for replays
+# (YYYY-MM-DD): 2026-10-19 - Per-piece lock counts for the score store
+# (YYYY-MM-DD): 2026-10-19 - Game events (rotate/lock/level_up/game_over) for listeners such as analytics
+# (YYYY-MM-DD): 2026-10-19 - Fixed multi-line clears removing the wrong rows
+# (YYYY-MM-DD): 2026-10-19 - Flat occupancy board (bytearray) for zero-copy observers
+# (YYYY-MM-DD): 2026-10-19 - Garbage rows for versus mode (the falling piece is lifted out of incoming rows)
+# (YYYY-MM-DD): 2026-10-19 - Incremental T-spin/mini, combo, back-to-back and perfect-clear scoring
+# (YYYY-MM-DD): 2026-10-19 - Lock events carry the locked cells and cleared rows (for render-layer animations)
 
-import pygame
 import random
 from config import *
+from startup import lazy_import
 
 class Tetromino:
     def __init__(self, shape_name, position_offset=(GRID_COLS // 2 - 2, 0)): # Adjusted offset for wider pieces
@@ -18,6 +27,7 @@ class Tetromino:
         self.current_shape_coords = self.all_rotations[self.rotation_index]
         self.x = position_offset[0]
         self.y = position_offset[1]
+        self.last_kick_index = None # Kick test used by the last successful rotation; None once it moves
 
     def get_world_coords(self):
         blocks = []
@@ -37,8 +47,36 @@ class Tetromino:
         self.current_shape_coords = self.all_rotations[self.rotation_index]
 
 
+# Occupancy codes used in TetrisGame.board: 0 = empty, otherwise 1 + index of the shape in TETROMINO_SHAPES
+PIECE_IDS = {name: index + 1 for index, name in enumerate(TETROMINO_SHAPES)}
+GARBAGE_ID = len(PIECE_IDS) + 1
+
+# T-spin corners, relative to the T pivot (local (1, 1) in every TETROMINO_SHAPES['T'] state), and the two
+# "front" corners on the side the T points to, per rotation state (indexes into T_CORNERS).
+T_CORNERS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+T_FRONT_CORNERS = {0: (0, 1), 1: (1, 3), 2: (2, 3), 3: (0, 2)}
+LINE_CLEAR_NAMES = ['', 'single', 'double', 'triple', 'tetris']
+EMPTY_BOARD_ROW = bytes(GRID_COLS)
+
+# Events passed to TetrisGame.event_listeners, as plain tuples (kind first):
+#   ('rotate', piece_name, rotation_key, kick_index)  kick_index is None when every kick test failed
+#   ('lock', piece_name, lines_cleared, cells, cleared_rows)  cells are the locked (row, col)s and cleared_rows
+#       the row indices removed, both in board coordinates from before the clear
+#   ('level_up', level, fall_delay)
+#   ('game_over', score, lines_cleared_total, level)
+#   ('clear', kind, lines, back_to_back, combo, perfect_clear, points)  after scoring a line clear or T-spin;
+#       kind is e.g. 'double', 't_spin_double', 't_spin_mini' (see clear_kind()), combo counts from 0
+
 class TetrisGame:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed) # Own RNG so a recorded game can be replayed from its seed
+        self.pieces_locked = 0
+        self.piece_counts = dict.fromkeys(TETROMINO_SHAPES, 0) # Locked pieces per shape
+        self.event_listeners = [] # Callables receiving event tuples, see emit()
+        # Row-major mirror of `grid` holding PIECE_IDS codes. Only ever modified in place (never resized or
+        # rebound), so buffer views such as numpy.frombuffer(game.board) stay valid for the game's lifetime.
+        self.board = bytearray(GRID_ROWS * GRID_COLS)
         self.grid = self.create_grid()
         self.current_piece = self.new_piece()
         self.next_piece = self.new_piece()
@@ -46,19 +84,37 @@ class TetrisGame:
         self.level = 1
         self.lines_cleared_total = 0
         self.lines_cleared_for_level = 0
+        self.last_cleared_rows = () # Rows removed by the last clear_lines() call, top to bottom
         self.fall_delay = INITIAL_FALL_DELAY
         self.game_over = False
         self.paused = False
+        self.combo = -1 # Clearing locks in a row minus one; -1 when the last lock cleared nothing
+        self.back_to_back = False # Last line clear was a tetris or a T-spin
+        self.filled_cells = 0 # Running count of occupied cells, for perfect clears without a board scan
+        self.unseen_reward_messages = [] # Achieved since the last check_and_trigger_rewards() call
+
+        self._surface = None # Created on first access, see `surface`
+        self._pause_font = None
+        self._pause_overlay = None
 
-        self.surface = pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT))
-        
         self.achieved_rewards = set() # To store keys of achieved rewards
 
+    @property
+    def surface(self):
+        if self._surface is None:
+            pygame = lazy_import("pygame")
+            self._surface = pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT))
+        return self._surface
+
+    def emit(self, *event):
+        for listener in self.event_listeners:
+            listener(event)
+
     def create_grid(self, filled_value=None):
         return [[filled_value for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
 
     def new_piece(self):
-        shape_name = random.choice(list(TETROMINO_SHAPES.keys()))
+        shape_name = self.rng.choice(list(TETROMINO_SHAPES.keys()))
         # Ensure I piece spawns more centrally if grid is narrow
         offset_x = GRID_COLS // 2 - 2 if shape_name == 'I' else GRID_COLS // 2 - 1
         return Tetromino(shape_name, position_offset=(offset_x, 0))
@@ -91,9 +147,10 @@ class TetrisGame:
         if not self.check_collision(self.current_piece, dx, dy):
             self.current_piece.x += dx
             self.current_piece.y += dy
+            self.current_piece.last_kick_index = None # Last movement is no longer a rotation
             if dy > 0:
                 self.score += SCORE_SOFT_DROP_PER_ROW
-                self.check_and_trigger_rewards() # Check rewards on score change
+                self.update_rewards() # Check rewards on score change
             return True # Move successful
         elif dy > 0: # Trying to move down but collision detected
             self.lock_piece()
@@ -126,69 +183,191 @@ class TetrisGame:
 
         kick_tests = kick_data_table.get(rotation_key, [(0,0)]) # Default to (0,0) if no specific kicks
 
-        for dx_kick, dy_kick in kick_tests:
+        for kick_index, (dx_kick, dy_kick) in enumerate(kick_tests):
             # Check collision with the *rotated shape* at the *kicked position*
             if not self.check_collision(piece, dx_kick, dy_kick, shape_coords_to_check=rotated_shape_coords):
                 piece.x += dx_kick
                 piece.y += dy_kick
                 piece.current_shape_coords = rotated_shape_coords # Commit the new shape
                 # piece.rotation_index is already updated by piece.rotate()
+                piece.last_kick_index = kick_index # For T-spin detection at lock
+                if self.event_listeners:
+                    self.emit('rotate', piece.name, rotation_key, kick_index)
                 return  # Successful rotation with kick
 
         # If all kicks fail, revert to original state
         piece.x, piece.y = original_x, original_y
         piece.rotation_index = original_rotation_index
         piece.current_shape_coords = piece.all_rotations[original_rotation_index]
+        if self.event_listeners:
+            self.emit('rotate', piece.name, rotation_key, None)
 
 
     def lock_piece(self):
-        for r_abs, c_abs in self.current_piece.get_world_coords():
+        piece_rows = set()
+        locked_cells = self.current_piece.get_world_coords()
+        for r_abs, c_abs in locked_cells:
             if 0 <= r_abs < GRID_ROWS and 0 <= c_abs < GRID_COLS:
                 self.grid[r_abs][c_abs] = self.current_piece.color
+                self.board[r_abs * GRID_COLS + c_abs] = PIECE_IDS[self.current_piece.name]
+                self.filled_cells += 1
+                piece_rows.add(r_abs)
             elif r_abs < 0 : # Piece locked partially or fully above the visible grid
                 self.game_over = True
+                self.emit('game_over', self.score, self.lines_cleared_total, self.level)
                 return
+        self.pieces_locked += 1
+        self.piece_counts[self.current_piece.name] += 1
 
-        lines_cleared_this_turn = self.clear_lines()
-        if lines_cleared_this_turn > 0:
-            self.update_score_and_level(lines_cleared_this_turn)
+        t_spin = self.detect_t_spin() # Before clearing: the corners are judged on the board as locked
+        lines_cleared_this_turn = self.clear_lines(piece_rows) # Only rows the piece touched can be full
+        if self.event_listeners:
+            self.emit('lock', self.current_piece.name, lines_cleared_this_turn,
+                      tuple(locked_cells), self.last_cleared_rows)
+        self.score_lock(lines_cleared_this_turn, t_spin)
 
         self.current_piece = self.next_piece
         self.next_piece = self.new_piece()
 
         if self.check_collision(self.current_piece):
             self.game_over = True
+            self.emit('game_over', self.score, self.lines_cleared_total, self.level)
         
-        self.check_and_trigger_rewards() # Check rewards after piece lock / game over potentially
+        self.update_rewards() # Check rewards after piece lock / game over potentially
 
-    def clear_lines(self):
-        lines_to_clear = []
-        for r_idx, row in enumerate(self.grid):
-            if all(cell is not None for cell in row):
-                lines_to_clear.append(r_idx)
+    def clear_lines(self, candidate_rows=None):
+        """Clears full rows among candidate_rows (all rows if None) and returns how many were cleared."""
+        board = self.board
+        rows_to_check = sorted(candidate_rows) if candidate_rows is not None else range(GRID_ROWS)
+        lines_to_clear = [r_idx for r_idx in rows_to_check if 0 not in board[r_idx * GRID_COLS:(r_idx + 1) * GRID_COLS]]
+        self.last_cleared_rows = tuple(lines_to_clear)
 
         if lines_to_clear:
-            for r_idx in sorted(lines_to_clear, reverse=True):
+            # Top to bottom: removing row r and inserting an empty row 0 leaves every row below r in place,
+            # so the remaining indices stay valid (bottom-up removal deleted the wrong rows on multi-line clears)
+            for r_idx in lines_to_clear:
                 del self.grid[r_idx]
                 self.grid.insert(0, [None for _ in range(GRID_COLS)])
+                board[GRID_COLS:(r_idx + 1) * GRID_COLS] = board[:r_idx * GRID_COLS] # Same length: in place
+                board[:GRID_COLS] = EMPTY_BOARD_ROW
+            self.filled_cells -= len(lines_to_clear) * GRID_COLS
         return len(lines_to_clear)
 
-    def update_score_and_level(self, lines_cleared_count):
-        self.score += SCORE_PER_LINE[min(lines_cleared_count, len(SCORE_PER_LINE)-1)] * self.level
+    def detect_t_spin(self):
+        """3-corner rule for the piece being locked: 'full', 'mini' or None. Costs four cell lookups."""
+        piece = self.current_piece
+        if piece.name != 'T' or piece.last_kick_index is None:
+            return None
+        pivot_r, pivot_c = piece.y + 1, piece.x + 1
+        occupied = []
+        for dr, dc in T_CORNERS:
+            r, c = pivot_r + dr, pivot_c + dc
+            occupied.append(not (0 <= r < GRID_ROWS and 0 <= c < GRID_COLS) or self.board[r * GRID_COLS + c] != 0)
+        if sum(occupied) < 3:
+            return None
+        front_a, front_b = T_FRONT_CORNERS[piece.rotation_index]
+        if (occupied[front_a] and occupied[front_b]) or piece.last_kick_index == T_SPIN_UPGRADE_KICK_INDEX:
+            return 'full'
+        return 'mini'
+
+    @staticmethod
+    def clear_kind(lines, t_spin):
+        if t_spin == 'full':
+            return 't_spin' + ('_' + LINE_CLEAR_NAMES[lines] if lines else '')
+        if t_spin == 'mini':
+            return 't_spin_mini' + ('_' + LINE_CLEAR_NAMES[lines] if lines else '')
+        return LINE_CLEAR_NAMES[min(lines, len(LINE_CLEAR_NAMES) - 1)]
+
+    def score_lock(self, lines, t_spin):
+        """Scores a lock from its line count and T-spin result; combo/back-to-back/perfect clear are O(1)."""
+        if not lines and not t_spin:
+            self.combo = -1
+            return
+
+        level = self.level
+        if t_spin == 'full':
+            points = SCORE_T_SPIN[min(lines, len(SCORE_T_SPIN) - 1)]
+        elif t_spin == 'mini':
+            points = SCORE_T_SPIN_MINI[min(lines, len(SCORE_T_SPIN_MINI) - 1)]
+        else:
+            points = SCORE_PER_LINE[min(lines, len(SCORE_PER_LINE) - 1)]
+
+        back_to_back = False
+        perfect_clear = False
+        if lines:
+            difficult = lines >= 4 or t_spin is not None
+            back_to_back = difficult and self.back_to_back
+            self.back_to_back = difficult
+            self.combo += 1
+            perfect_clear = self.filled_cells == 0
+        else:
+            self.combo = -1 # A T-spin without lines keeps back-to-back but ends the combo
+
+        if MODERN_SCORING:
+            points *= level
+            if back_to_back:
+                points = int(points * BACK_TO_BACK_MULTIPLIER)
+            if self.combo > 0:
+                points += SCORE_COMBO * self.combo * level
+            if perfect_clear:
+                points += SCORE_PERFECT_CLEAR[min(lines, len(SCORE_PERFECT_CLEAR) - 1)] * level
+        else:
+            points = SCORE_PER_LINE[min(lines, len(SCORE_PER_LINE) - 1)] * level # Classic: lines only
+
+        kind = self.clear_kind(lines, t_spin)
+        self.record_clear_rewards(kind, back_to_back, perfect_clear)
+        self.update_score_and_level(lines, points)
+        if self.event_listeners:
+            self.emit('clear', kind, lines, back_to_back, max(self.combo, 0), perfect_clear, points)
+
+    def add_garbage(self, count, hole_col):
+        """Pushes `count` garbage rows (one hole at hole_col) up from the bottom; tops out on overflow."""
+        count = min(count, GRID_ROWS)
+        if count <= 0 or self.game_over:
+            return
+        pushed_out_cells = sum(cell is not None for row in self.grid[:count] for cell in row)
+        overflow = pushed_out_cells > 0
+        del self.grid[:count]
+        for _ in range(count):
+            row = [GARBAGE_COLOR for _ in range(GRID_COLS)]
+            row[hole_col] = None
+            self.grid.append(row)
+
+        board = self.board
+        garbage_row = bytearray([GARBAGE_ID]) * GRID_COLS
+        garbage_row[hole_col] = 0
+        board[:(GRID_ROWS - count) * GRID_COLS] = board[count * GRID_COLS:] # Same length: in place
+        board[(GRID_ROWS - count) * GRID_COLS:] = garbage_row * count
+
+        self.filled_cells += count * (GRID_COLS - 1) - pushed_out_cells
+        # The stack rose under the falling piece: lift it by the fewest rows (at most `count`) that clear it
+        piece = self.current_piece
+        lift = next((rows for rows in range(count + 1) if not self.check_collision(piece, 0, -rows)), None)
+        if lift:
+            piece.y -= lift
+        if overflow or lift is None: # Stack pushed past the top, or the piece cannot fit even lifted
+            self.game_over = True
+            self.emit('game_over', self.score, self.lines_cleared_total, self.level)
+
+    def update_score_and_level(self, lines_cleared_count, points=None):
+        if points is None:
+            points = SCORE_PER_LINE[min(lines_cleared_count, len(SCORE_PER_LINE)-1)] * self.level
+        self.score += points
         self.lines_cleared_total += lines_cleared_count
         self.lines_cleared_for_level += lines_cleared_count
 
         if self.lines_cleared_for_level >= LEVEL_UP_LINES:
             self.level_up()
         
-        self.check_and_trigger_rewards()
+        self.update_rewards()
 
     def level_up(self):
         self.level += 1
         self.lines_cleared_for_level = 0 # Reset for next level
         self.fall_delay = max(MIN_FALL_DELAY, int(self.fall_delay * SPEED_MULTIPLIER_PER_LEVEL))
         print(f"Level Up! Level: {self.level}, Fall Delay: {self.fall_delay}")
-        self.check_and_trigger_rewards() # Check level-based rewards
+        self.emit('level_up', self.level, self.fall_delay)
+        self.update_rewards() # Check level-based rewards
 
     def hard_drop(self):
         if self.game_over or self.paused:
@@ -197,8 +376,10 @@ class TetrisGame:
         while not self.check_collision(self.current_piece, 0, 1):
             self.current_piece.y += 1
             rows_dropped +=1
+        if rows_dropped:
+            self.current_piece.last_kick_index = None
         self.score += SCORE_HARD_DROP_PER_ROW * rows_dropped
-        self.lock_piece() # lock_piece will also call check_and_trigger_rewards
+        self.lock_piece() # lock_piece will also call update_rewards
 
     def fall(self):
         if self.game_over or self.paused:
@@ -208,7 +389,12 @@ class TetrisGame:
     def toggle_pause(self):
         self.paused = not self.paused
 
-    def reset_game(self):
+    def reset_game(self, seed=None):
+        self.seed = seed
+        self.rng.seed(seed)
+        self.pieces_locked = 0
+        self.piece_counts = dict.fromkeys(TETROMINO_SHAPES, 0)
+        self.board[:] = bytes(len(self.board))
         self.grid = self.create_grid()
         self.current_piece = self.new_piece()
         self.next_piece = self.new_piece()
@@ -219,11 +405,98 @@ class TetrisGame:
         self.fall_delay = INITIAL_FALL_DELAY
         self.game_over = False
         self.paused = False
+        self.combo = -1
+        self.back_to_back = False
+        self.filled_cells = 0
         self.achieved_rewards.clear() # Reset rewards
+        self.unseen_reward_messages.clear()
+
+    def get_state(self):
+        """Returns a picklable snapshot of everything the game logic depends on."""
+        return {
+            'grid': [row[:] for row in self.grid],
+            'board': bytes(self.board),
+            'current_piece': (self.current_piece.name, self.current_piece.rotation_index,
+                              self.current_piece.x, self.current_piece.y, self.current_piece.last_kick_index),
+            'next_piece': (self.next_piece.name, self.next_piece.rotation_index,
+                           self.next_piece.x, self.next_piece.y),
+            'score': self.score,
+            'level': self.level,
+            'lines_cleared_total': self.lines_cleared_total,
+            'lines_cleared_for_level': self.lines_cleared_for_level,
+            'fall_delay': self.fall_delay,
+            'game_over': self.game_over,
+            'paused': self.paused,
+            'achieved_rewards': set(self.achieved_rewards),
+            'pieces_locked': self.pieces_locked,
+            'combo': self.combo,
+            'back_to_back': self.back_to_back,
+            'filled_cells': self.filled_cells,
+            'piece_counts': dict(self.piece_counts),
+            'seed': self.seed,
+            'rng_state': self.rng.getstate(),
+        }
+
+    def set_state(self, state):
+        def make_piece(name, rotation_index, x, y, last_kick_index=None):
+            piece = Tetromino(name, position_offset=(x, y))
+            piece.rotation_index = rotation_index
+            piece.current_shape_coords = piece.all_rotations[rotation_index]
+            piece.last_kick_index = last_kick_index
+            return piece
+
+        self.grid = [row[:] for row in state['grid']]
+        self.board[:] = state['board']
+        self.current_piece = make_piece(*state['current_piece'])
+        self.next_piece = make_piece(*state['next_piece'])
+        self.score = state['score']
+        self.level = state['level']
+        self.lines_cleared_total = state['lines_cleared_total']
+        self.lines_cleared_for_level = state['lines_cleared_for_level']
+        self.fall_delay = state['fall_delay']
+        self.game_over = state['game_over']
+        self.paused = state['paused']
+        self.achieved_rewards = set(state['achieved_rewards'])
+        self.pieces_locked = state['pieces_locked']
+        self.combo = state['combo']
+        self.back_to_back = state['back_to_back']
+        self.filled_cells = state['filled_cells']
+        self.unseen_reward_messages = []
+        self.piece_counts = dict(state['piece_counts'])
+        self.seed = state['seed']
+        self.rng.setstate(state['rng_state'])
 
     def check_and_trigger_rewards(self):
         """Checks if any reward thresholds have been met and returns messages."""
-        newly_achieved_messages = []
+        # Returns everything achieved since the previous call, including rewards unlocked inside
+        # lock/level-up handling (those used to be consumed by the internal checks and never shown).
+        self.update_rewards()
+        newly_achieved_messages = self.unseen_reward_messages
+        self.unseen_reward_messages = []
+        return newly_achieved_messages
+
+    def record_clear_rewards(self, kind, back_to_back, perfect_clear):
+        """Once-per-game achievements from the same clear results that are sent to analytics."""
+        keys = []
+        if kind.startswith('t_spin'):
+            keys.append('t_spin')
+        if kind == 'tetris':
+            keys.append('tetris')
+        if back_to_back:
+            keys.append('back_to_back')
+        if perfect_clear:
+            keys.append('perfect_clear')
+        if self.combo >= COMBO_REWARD_TRIGGER:
+            keys.append('combo')
+        for key in keys:
+            reward_key = f"clear_{key}"
+            if key in CLEAR_REWARDS and reward_key not in self.achieved_rewards:
+                self.achieved_rewards.add(reward_key)
+                self.unseen_reward_messages.append(CLEAR_REWARDS[key])
+
+    def update_rewards(self):
+        """Marks newly met score/level thresholds as achieved and queues their messages."""
+        newly_achieved_messages = self.unseen_reward_messages
         # Score-based rewards
         for threshold_score, message in REWARD_THRESHOLDS.items():
             if isinstance(threshold_score, int) and self.score >= threshold_score:
@@ -244,6 +517,7 @@ class TetrisGame:
 
 
     def draw(self, surface):
+        pygame = lazy_import("pygame")
         surface.fill(EMPTY_CELL_COLOR)
 
         for r in range(GRID_ROWS):
@@ -268,12 +542,15 @@ class TetrisGame:
                                      (c_abs * BLOCK_SIZE, r_abs * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 1)
 
         if self.paused and not self.game_over: # Only show PAUSED if game is not over
-            font = pygame.font.Font(None, 60) # Using Pygame's default font
-            text_surf = font.render("PAUSED", True, WHITE)
-            # Semi-transparent overlay
-            overlay = pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128)) # Black with 50% alpha
-            surface.blit(overlay, (0,0))
+            if self._pause_overlay is None: # Only the font submodule is needed, and only once paused
+                if not pygame.font.get_init():
+                    pygame.font.init()
+                self._pause_font = pygame.font.Font(None, 60) # Using Pygame's default font
+                # Semi-transparent overlay
+                self._pause_overlay = pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT), pygame.SRCALPHA)
+                self._pause_overlay.fill((0, 0, 0, 128)) # Black with 50% alpha
+            text_surf = self._pause_font.render("PAUSED", True, WHITE)
+            surface.blit(self._pause_overlay, (0,0))
             text_rect = text_surf.get_rect(center=(PYGAME_SURFACE_WIDTH / 2, PYGAME_SURFACE_HEIGHT / 2))
             surface.blit(text_surf, text_rect)
 
@@ -0,0 +1,299 @@
+# latency.py
+# (YYYY-MM-DD): 2026-10-19 - Input latency tracing (key event -> displayed frame) and a synthetic-input harness
+# (YYYY-MM-DD): 2026-10-19 - Headless harness (no Tk, no display) driving GameRunner through a stand-in UI
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from analytics import Histogram, QuantileSketch, RunningStats
+from config import *
+from startup import lazy_import
+
+# Stages stamped along the input path, in order. Each stage's duration is measured from the previous stamp:
+#   event      handle_keypress entered (t0)
+#   logic      game state updated (move/rotate/drop)
+#   draw       TetrisGame.draw into the pygame surface
+#   convert    surface -> PIL image, resized to the label
+#   commit     CTkImage created and configured on game_canvas_label
+#   widgets    score/level/next-piece widgets updated
+#   displayed  Tk reached idle after the commit, i.e. the label has been redrawn
+STAGES = ('event', 'logic', 'draw', 'convert', 'commit', 'widgets', 'displayed')
+
+KEY_ACTIONS = {
+    'left': 'move', 'a': 'move', 'right': 'move', 'd': 'move', 'down': 'move', 's': 'move',
+    'up': 'rotate', 'w': 'rotate', 'r': 'rotate',
+    'space': 'hard_drop',
+}
+
+
+class LatencyTrace:
+    __slots__ = ('action', 'stamps')
+
+    def __init__(self, action):
+        self.action = action
+        self.stamps = [('event', time.perf_counter())]
+
+    def stamp(self, stage):
+        self.stamps.append((stage, time.perf_counter()))
+
+
+class LatencyTracer:
+    """Per-action latency histograms and quantiles, with frames over `budget_ms` flagged and kept."""
+    def __init__(self, budget_ms=LATENCY_BUDGET_MS, slow_frames_kept=LATENCY_SLOW_FRAMES_KEPT, verbose=True):
+        self.budget_ms = budget_ms
+        self.verbose = verbose # Print a line for every over-budget frame
+        self.totals = {} # action -> RunningStats of end-to-end ms
+        self.quantiles = {} # action -> QuantileSketch of end-to-end ms
+        self.histograms = {} # action -> Histogram of end-to-end ms (1 ms bins)
+        self.stage_stats = {} # (action, stage) -> RunningStats of ms spent in that stage
+        self.over_budget = {} # action -> frames over budget
+        self.slow_frames = deque(maxlen=slow_frames_kept) # (action, total_ms, {stage: ms}) of recent slow frames
+
+    def begin(self, key):
+        """Starts a trace for a key press, or returns None for keys that do not produce a game action."""
+        action = KEY_ACTIONS.get(key)
+        return LatencyTrace(action) if action else None
+
+    def finish(self, trace):
+        trace.stamp('displayed')
+        stages = {}
+        previous = trace.stamps[0][1]
+        for stage, stamp in trace.stamps[1:]:
+            stages[stage] = (stamp - previous) * 1000
+            previous = stamp
+        total_ms = (trace.stamps[-1][1] - trace.stamps[0][1]) * 1000
+
+        action = trace.action
+        if action not in self.totals:
+            self.totals[action] = RunningStats()
+            self.quantiles[action] = QuantileSketch()
+            self.histograms[action] = Histogram(bin_width=1)
+            self.over_budget[action] = 0
+        self.totals[action].add(total_ms)
+        self.quantiles[action].add(total_ms)
+        self.histograms[action].add(total_ms)
+        for stage, ms in stages.items():
+            stats = self.stage_stats.get((action, stage))
+            if stats is None:
+                stats = self.stage_stats[(action, stage)] = RunningStats()
+            stats.add(ms)
+
+        if total_ms > self.budget_ms:
+            self.over_budget[action] += 1
+            self.slow_frames.append((action, total_ms, stages))
+            if self.verbose:
+                worst_stage = max(stages, key=stages.get)
+                print(f"Slow frame: {action} took {total_ms:.1f} ms (budget {self.budget_ms} ms, "
+                      f"worst stage {worst_stage} {stages[worst_stage]:.1f} ms)")
+
+    def frames(self):
+        return sum(stats.count for stats in self.totals.values())
+
+    def over_budget_ratio(self):
+        frames = self.frames()
+        return sum(self.over_budget.values()) / frames if frames else 0.0
+
+    def report(self):
+        lines = [f"Input latency (key event -> displayed frame), budget {self.budget_ms} ms"]
+        for action in sorted(self.totals):
+            total = self.totals[action].summary()
+            quantiles = self.quantiles[action].summary()
+            lines.append(f"  {action:<10} n={total['count']:<6} mean={total['mean']:.2f} ms "
+                         f"p50={quantiles['p50']:.2f} p90={quantiles['p90']:.2f} p99={quantiles['p99']:.2f} "
+                         f"max={total['max']:.2f} over budget={self.over_budget[action]}")
+            breakdown = ", ".join(f"{stage} {self.stage_stats[(action, stage)].mean:.2f}"
+                                  for stage in STAGES[1:] if (action, stage) in self.stage_stats)
+            lines.append(f"  {'':<10} mean per stage (ms): {breakdown}")
+            lines.append(f"  {'':<10} histogram (ms): {self.histograms[action].summary()}")
+        return "\n".join(lines)
+
+
+class _Var:
+    def __init__(self):
+        self.value = ""
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _MappedLabel:
+    def winfo_width(self):
+        return PYGAME_SURFACE_WIDTH
+
+
+class HeadlessUI:
+    """Stands in for TetrisUI without Tk: GameRunner drives it exactly like the real window.
+
+    The canvas update does the real surface -> PIL conversion and resize (the 'convert' stage) and stops
+    short of handing the image to Tk, so only the final Tk commit and repaint are not measured. Timers run
+    on a virtual clock advanced by run_until(), idle callbacks by run_idle().
+    """
+    def __init__(self, canvas_size=(PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT)):
+        self.canvas_size = canvas_size
+        self.now_ms = 0
+        self._timers = {} # id -> (due_ms, callback, args)
+        self._idle = []
+        self._next_id = 0
+        self.fall_timer_id = None
+        self.game_over_dialog = None
+        self.game_canvas_label = _MappedLabel()
+        self.rewards_message_var = _Var()
+        self.image = None # Last converted frame
+
+    def after(self, ms, callback, *args):
+        self._next_id += 1
+        self._timers[self._next_id] = (self.now_ms + ms, callback, args)
+        return self._next_id
+
+    def after_cancel(self, timer_id):
+        self._timers.pop(timer_id, None)
+
+    def after_idle(self, callback, *args):
+        self._idle.append((callback, args))
+
+    def run_idle(self):
+        idle, self._idle = self._idle, []
+        for callback, args in idle:
+            callback(*args)
+
+    def run_until(self, now_ms):
+        """Advances the virtual clock, firing due timers in order (including ones they schedule)."""
+        while True:
+            due = [(entry[0], timer_id) for timer_id, entry in self._timers.items() if entry[0] <= now_ms]
+            if not due:
+                break
+            due_ms, timer_id = min(due)
+            _, callback, args = self._timers.pop(timer_id)
+            self.now_ms = due_ms
+            callback(*args)
+        self.now_ms = now_ms
+
+    def update_game_canvas(self, pygame_surface, trace=None):
+        pygame = lazy_import("pygame")
+        Image = lazy_import("PIL.Image")
+        pil_img = Image.frombytes("RGB", pygame_surface.get_size(), pygame.image.tostring(pygame_surface, "RGB"))
+        self.image = pil_img.resize(self.canvas_size, Image.Resampling.LANCZOS)
+        if trace:
+            trace.stamp('convert')
+            trace.stamp('commit')
+        return True
+
+    def update_score_display(self, score):
+        pass
+
+    def update_level_display(self, level):
+        pass
+
+    def draw_next_piece(self, piece):
+        pass
+
+    def update_rewards_display(self, reward_messages):
+        pass
+
+    def enable_game_controls(self, game_is_running=True, game_is_paused=False):
+        pass
+
+    def show_game_over_message(self, final_score, best_score=None):
+        pass
+
+    def toggle_pause_button(self):
+        pass # The harness never presses 'p'
+
+    def build_deferred_panels(self):
+        pass
+
+
+class _KeyEvent:
+    def __init__(self, keysym):
+        self.keysym = keysym
+
+
+HARNESS_KEYS = ['Left', 'Right', 'Down', 'Up', 'Left', 'Right', 'Up', 'space'] # Weighted towards moves/rotations
+
+
+def run_headless_harness(presses=300, interval_ms=30, budget_ms=LATENCY_BUDGET_MS, seed=0):
+    """Replays synthetic key presses through GameRunner with a HeadlessUI; returns the filled LatencyTracer.
+
+    Needs no display, so tests and CI can fail on latency regressions in the logic/draw/convert path.
+    """
+    from main import GameRunner # Deferred: main imports this module lazily
+
+    tracer = LatencyTracer(budget_ms, verbose=False)
+    ui = HeadlessUI()
+    with tempfile.TemporaryDirectory(prefix="tetris-latency-") as scores_dir: # Removed once the store is closed
+        runner = GameRunner(scores_dir=scores_dir, tracer=tracer, animations=False, ui=ui)
+        rng = random.Random(seed)
+        try:
+            runner.show_first_frame() # Pays the lazy pygame/PIL imports up front, like the real app's first frame
+            for _ in range(presses):
+                if not runner.game_active: # First press, or the previous game topped out
+                    runner.start_game()
+                runner.handle_keypress(_KeyEvent(rng.choice(HARNESS_KEYS)))
+                ui.run_idle() # The frame counts as displayed once the loop would be idle
+                ui.run_until(ui.now_ms + interval_ms) # Gravity keeps running between presses
+        finally:
+            runner.score_store.close()
+    return tracer
+
+
+def run_harness(presses=300, interval_ms=30, budget_ms=LATENCY_BUDGET_MS, seed=0):
+    """Plays the real Tk app with synthetic <KeyPress> events and returns the filled LatencyTracer.
+
+    Needs a display; on headless machines run it under a virtual one, e.g. `xvfb-run python latency.py`.
+    """
+    from main import GameRunner # Deferred: main imports this module
+
+    tracer = LatencyTracer(budget_ms, verbose=False)
+    # Animations off: their frames would interleave with the traced ones and they are not part of the input path
+    with tempfile.TemporaryDirectory(prefix="tetris-latency-") as scores_dir: # run() closes the store first
+        runner = GameRunner(scores_dir=scores_dir, tracer=tracer, animations=False)
+        rng = random.Random(seed)
+        keys = HARNESS_KEYS
+        remaining = [presses]
+
+        def press():
+            if remaining[0] <= 0:
+                runner.ui.after(200, runner.ui.quit) # Let the last frames reach idle
+                return
+            if not runner.game_active: # First press, or the previous game topped out
+                runner.start_game()
+            runner.ui.event_generate("<KeyPress>", keysym=rng.choice(keys), when="tail")
+            remaining[0] -= 1
+            runner.ui.after(interval_ms, press)
+
+        runner.ui.after(500, press) # Give the window time to map before injecting input
+        runner.run()
+    return tracer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inject synthetic key presses and report input latency.")
+    parser.add_argument("--presses", type=int, default=300)
+    parser.add_argument("--interval-ms", type=int, default=30, help="Delay between synthetic key presses")
+    parser.add_argument("--budget-ms", type=float, default=LATENCY_BUDGET_MS)
+    parser.add_argument("--max-over-budget", type=float, default=0.01,
+                        help="Fail (exit 1) if more than this fraction of frames exceed the budget")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--headless", action="store_true",
+                        help="Drive GameRunner through a stand-in UI (no Tk/display; the Tk repaint is not measured)")
+    args = parser.parse_args(argv)
+
+    harness = run_headless_harness if args.headless else run_harness
+    tracer = harness(args.presses, args.interval_ms, args.budget_ms, args.seed)
+    print(tracer.report())
+    ratio = tracer.over_budget_ratio()
+    if not tracer.frames() or ratio > args.max_over_budget:
+        print(f"FAIL: {ratio:.1%} of {tracer.frames()} frames over {args.budget_ms} ms budget")
+        return 1
+    print(f"OK: {ratio:.1%} of {tracer.frames()} frames over {args.budget_ms} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
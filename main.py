@@ -1,37 +1,69 @@
 # main.py
 # (YYYY-MM-DD): 2025-05-10 - Main script to initialize and run the Tetris game
 # (YYYY-MM-DD): 2025-05-11 - Integrated rewards display, refined game state transitions
+# (YYYY-MM-DD): 2026-10-19 - Lazy imports, no blanket pygame.init(), startup timing report (--startup-report)
+# (YYYY-MM-DD): 2026-10-19 - Seeded games and replay recording (--record-dir)
+# (YYYY-MM-DD): 2026-10-19 - Finished games persisted to the score store (--player, --scores-dir)
+# (YYYY-MM-DD): 2026-10-19 - Optional input latency tracing (--trace-latency)
+# (YYYY-MM-DD): 2026-10-19 - Non-blocking line-clear/lock/level-up animations on their own frame timer (--no-animations)
 
-import pygame
-import customtkinter as ctk # Not directly used here, but ui.py uses it
+from startup import TIMER, lazy_import # Keep first: TIMER's t0 is taken on import
+import argparse
+import os
+import random
+import sys
+import time
 from game import TetrisGame
-from ui import TetrisUI
+from animations import AnimationTimeline
+from replay import ReplayRecorder
+from scores import GameRecord, ScoreStore
 from config import *
 
-class GameRunner:
-    def __init__(self):
-        pygame.init()
-        pygame.font.init() # Explicitly initialize font module
+TIMER.mark("core modules imported")
 
+class GameRunner:
+    def __init__(self, record_dir=None, player="player", scores_dir=SCORE_STORE_DIR, tracer=None,
+                 animations=ANIMATIONS_ENABLED, ui=None):
+        # No pygame.init(): Surfaces and drawing need no subsystem, the font module is initialized on first pause
         self.game_logic = TetrisGame()
-        self.ui = TetrisUI(
-            game_instance_provider=lambda: self.game_logic,
-            start_game_cb=self.start_game,
-            pause_game_cb=self.toggle_pause,
-            reset_game_cb=self.reset_game,
-            handle_input_cb=self.handle_keypress
-        )
+        if ui is None: # Tests and the headless latency harness pass a stand-in (latency.HeadlessUI)
+            TetrisUI = lazy_import("ui").TetrisUI # Pulls in customtkinter
+            ui = TetrisUI(
+                game_instance_provider=lambda: self.game_logic,
+                start_game_cb=self.start_game,
+                pause_game_cb=self.toggle_pause,
+                reset_game_cb=self.reset_game,
+                handle_input_cb=self.handle_keypress
+            )
+        self.ui = ui
         self.ui.fall_timer_id = None # Give UI a reference to cancel timer if needed on close
 
         self.game_active = False
         self.fall_timer_id = None # For CTk's after method
+        # Animations only ever redraw the canvas on their own timer; the fall timer and input never wait on them
+        self.animations = AnimationTimeline(self.game_logic) if animations else None
+        self.animation_timer_id = None
+        self.recorder = ReplayRecorder()
+        self.record_dir = record_dir # Replays are written here on game over, see replay.py to render them
+        self.player = player
+        self.tracer = tracer # LatencyTracer or None
+        self.score_store = ScoreStore(scores_dir) # Index loads on the store's writer thread
+        self.game_started_at = None
+        self.paused_at = None
+        self.paused_total = 0.0
+        TIMER.mark("ui constructed")
 
     def start_game(self):
         if self.ui.game_over_dialog and self.ui.game_over_dialog.winfo_exists():
             self.ui.game_over_dialog.destroy()
 
         if not self.game_active:
-            self.game_logic.reset_game()
+            seed = random.randrange(2**32)
+            self.game_logic.reset_game(seed)
+            self.recorder.start(seed)
+            self.game_started_at = time.monotonic()
+            self.paused_at = None
+            self.paused_total = 0.0
             self.game_active = True
             self.game_logic.paused = False
             self.ui.enable_game_controls(game_is_running=True, game_is_paused=False)
@@ -45,6 +77,8 @@ class GameRunner:
             self.fall_timer_id = None
         
         self.game_logic.reset_game()
+        if self.animations:
+            self.animations.clear()
         self.game_active = False
         self.ui.enable_game_controls(game_is_running=False)
         self.ui.update_score_display(self.game_logic.score)
@@ -52,10 +86,8 @@ class GameRunner:
         self.ui.draw_next_piece(self.game_logic.next_piece)
         self.ui.rewards_message_var.set("Game Reset. Start a new game!")
         
-        # Draw initial empty board
-        empty_surface = pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT))
-        empty_surface.fill(EMPTY_CELL_COLOR) # Use config color
-        self.ui.update_game_canvas(self.game_logic.draw(empty_surface))
+        # Draw initial empty board (draw() fills the surface with EMPTY_CELL_COLOR first)
+        self.ui.update_game_canvas(self.game_logic.draw(self.game_logic.surface))
         print("Game reset")
 
     def toggle_pause(self):
@@ -67,8 +99,14 @@ class GameRunner:
             if self.fall_timer_id:
                 self.ui.after_cancel(self.fall_timer_id)
                 self.fall_timer_id = None
+            self.paused_at = time.monotonic()
+            self.recorder.pause()
             print("Game paused")
         else:
+            if self.paused_at is not None: # Paused time does not count towards game duration
+                self.paused_total += time.monotonic() - self.paused_at
+                self.paused_at = None
+            self.recorder.resume()
             self.schedule_next_fall() # Reschedule fall on unpause
             print("Game resumed")
         
@@ -88,20 +126,26 @@ class GameRunner:
             return
 
         key = event.keysym.lower()
+        trace = self.tracer.begin(key) if self.tracer else None
         action_taken = False
         if key == 'left' or key == 'a':
+            self.recorder.record('left')
             action_taken = self.game_logic.move(-1, 0)
         elif key == 'right' or key == 'd':
+            self.recorder.record('right')
             action_taken = self.game_logic.move(1, 0)
         elif key == 'down' or key == 's':
+            self.recorder.record('down')
             action_taken = self.game_logic.move(0, 1)
             if action_taken: # If soft drop was successful, reset fall timer for next natural fall
                 if self.fall_timer_id: self.ui.after_cancel(self.fall_timer_id)
                 self.schedule_next_fall() 
         elif key == 'up' or key == 'w' or key == 'r':
+            self.recorder.record('rotate')
             self.game_logic.rotate_piece()
             action_taken = True # Rotation is an action
         elif key == 'space':
+            self.recorder.record('hard_drop')
             self.game_logic.hard_drop() # This will lock the piece
             action_taken = True # Hard drop is a significant action
             # Fall timer will be reset by game_loop_step or next lock
@@ -109,7 +153,9 @@ class GameRunner:
             self.ui.toggle_pause_button() # Calls self.toggle_pause
 
         if action_taken or key in ['up', 'w', 'r', 'space']: # Update UI after any move/rotation/drop
-            self.update_ui_elements()
+            if trace:
+                trace.stamp('logic')
+            self.update_ui_elements(trace)
 
 
     def game_loop_step(self):
@@ -118,6 +164,7 @@ class GameRunner:
                 self.handle_game_over()
             return
 
+        self.recorder.record('fall')
         self.game_logic.fall() # Automatic fall
         self.update_ui_elements()
 
@@ -133,13 +180,37 @@ class GameRunner:
         if self.fall_timer_id:
             self.ui.after_cancel(self.fall_timer_id)
             self.fall_timer_id = None
-        self.ui.show_game_over_message(self.game_logic.score)
+        if self.record_dir:
+            replay_path = os.path.join(self.record_dir,
+                                       f"replay-{time.strftime('%Y%m%d-%H%M%S')}-{self.recorder.seed}.json")
+            self.recorder.save(replay_path)
+            print(f"Replay saved to {replay_path}")
+        self.save_finished_game()
+        # Only consult the index if it has finished loading; the dialog must not wait on disk
+        best_score = self.score_store.best_score() if self.score_store.ready.is_set() else None
+        if best_score is not None:
+            best_score = max(best_score, self.game_logic.score) # This game may still be queued
+        self.ui.show_game_over_message(self.game_logic.score, best_score)
         self.ui.enable_game_controls(game_is_running=False)
         # Final draw to ensure board is up-to-date before game over message
         current_game_surface = self.game_logic.draw(self.game_logic.surface)
         self.ui.update_game_canvas(current_game_surface)
 
 
+    def save_finished_game(self):
+        game = self.game_logic
+        duration = time.monotonic() - self.game_started_at - self.paused_total if self.game_started_at else 0.0
+        self.score_store.submit(GameRecord(
+            player=self.player,
+            score=game.score,
+            lines=game.lines_cleared_total,
+            level=game.level,
+            duration_ms=int(duration * 1000),
+            seed=game.seed,
+            piece_counts=dict(game.piece_counts),
+            timestamp=time.time(),
+        )) # Appended on the store's writer thread
+
     def schedule_next_fall(self):
         if self.game_active and not self.game_logic.paused and not self.game_logic.game_over:
             # Cancel previous timer if any, to prevent multiple loops if logic changes fall_delay rapidly
@@ -148,13 +219,29 @@ class GameRunner:
             self.fall_timer_id = self.ui.after(self.game_logic.fall_delay, self.game_loop_step)
             self.ui.fall_timer_id = self.fall_timer_id # Share with UI for potential cleanup on close
 
-    def update_ui_elements(self):
+    def render_board(self):
+        """Draws the committed board plus any running animation, and keeps animation frames coming."""
         current_game_surface = self.game_logic.draw(self.game_logic.surface)
-        self.ui.update_game_canvas(current_game_surface)
+        if self.animations and self.animations.draw(current_game_surface) and self.animation_timer_id is None:
+            self.animation_timer_id = self.ui.after(ANIMATION_FRAME_MS, self.animation_frame)
+        return current_game_surface
+
+    def animation_frame(self):
+        self.animation_timer_id = None
+        self.ui.update_game_canvas(self.render_board()) # Canvas only: the widgets have not changed
+
+    def update_ui_elements(self, trace=None):
+        current_game_surface = self.render_board()
+        if trace:
+            trace.stamp('draw')
+        self.ui.update_game_canvas(current_game_surface, trace)
 
         self.ui.update_score_display(self.game_logic.score)
         self.ui.update_level_display(self.game_logic.level)
         self.ui.draw_next_piece(self.game_logic.next_piece)
+        if trace:
+            trace.stamp('widgets')
+            self.ui.after_idle(self.tracer.finish, trace) # Tk redraws the label once it is idle
 
         # Check and display rewards
         new_reward_messages = self.game_logic.check_and_trigger_rewards()
@@ -162,21 +249,59 @@ class GameRunner:
             self.ui.update_rewards_display(new_reward_messages)
 
 
+    def show_first_frame(self):
+        # Score/level labels already show their initial values; only the board and preview need drawing.
+        current_game_surface = self.game_logic.draw(self.game_logic.surface)
+        if not self.ui.update_game_canvas(current_game_surface):
+            if self.ui.game_canvas_label.winfo_width() <= 1: # Label not mapped yet: try again next frame
+                self.ui.after(16, self.show_first_frame)
+                return
+            # Mapped, so the conversion itself failed (update_game_canvas printed why): don't spin on it
+            print("First frame could not be drawn; the board will appear on the next update.")
+        else:
+            TIMER.mark("first frame")
+        self.ui.draw_next_piece(self.game_logic.next_piece)
+        self.ui.build_deferred_panels()
+        TIMER.mark("deferred panels built")
+        if TIMER.enabled:
+            print(TIMER.report())
+
     def run(self):
         self.ui.enable_game_controls(game_is_running=False) # Initial state
-        self.update_ui_elements() # Show empty board, initial score/level
+        self.ui.after_idle(self.show_first_frame) # Show empty board once the window is mapped
         try:
             self.ui.mainloop()
         finally:
-            if self.fall_timer_id: # Ensure timer is cancelled if window is closed abruptly
-                try:
-                    self.ui.after_cancel(self.fall_timer_id)
-                except Exception: # Tkinter might be destroyed
-                    pass
-            pygame.quit()
+            for timer_id in (self.fall_timer_id, self.animation_timer_id): # Ensure timers are cancelled if window is closed abruptly
+                if timer_id:
+                    try:
+                        self.ui.after_cancel(timer_id)
+                    except Exception: # Tkinter might be destroyed
+                        pass
+            self.score_store.close() # Drains queued records and checkpoints the index
+            if self.tracer and self.tracer.frames():
+                print(self.tracer.report())
+            pygame = sys.modules.get("pygame")
+            if pygame: # Only if something actually imported it
+                pygame.quit()
             print("Application closed.")
 
 
 if __name__ == "__main__":
-    app_runner = GameRunner()
+    parser = argparse.ArgumentParser(description="CTk Sharp Tetris")
+    parser.add_argument("--startup-report", action="store_true", help="Print import costs and time to first frame")
+    parser.add_argument("--record-dir", help="Save a replay of every finished game into this directory")
+    parser.add_argument("--player", default="player", help="Name stored with this session's scores")
+    parser.add_argument("--scores-dir", default=SCORE_STORE_DIR, help="Score store location")
+    parser.add_argument("--trace-latency", action="store_true",
+                        help="Trace key press -> displayed frame latency, flag slow frames, report on exit")
+    parser.add_argument("--no-animations", action="store_true", help="Disable line-clear/lock/level-up animations")
+    args = parser.parse_args()
+    if args.startup_report:
+        TIMER.enabled = True
+    if args.record_dir:
+        os.makedirs(args.record_dir, exist_ok=True)
+    app_runner = GameRunner(record_dir=args.record_dir, player=args.player, scores_dir=args.scores_dir,
+                            tracer=lazy_import("latency").LatencyTracer() if args.trace_latency else None,
+                            animations=ANIMATIONS_ENABLED and not args.no_animations)
     app_runner.run()
@@ -0,0 +1,258 @@
+# replay.py
+# (YYYY-MM-DD): 2026-10-19 - Replay recording and headless, parallel replay-to-frames renderer
+# (YYYY-MM-DD): 2026-10-19 - Timestamped actions, rendered at a fixed frame rate (real game speed)
+
+import argparse
+import contextlib
+import json
+import mmap
+import os
+import sys
+import time
+from bisect import bisect_right
+from config import *
+from game import TetrisGame
+from startup import lazy_import
+
+# A replay is the game seed plus the ordered list of logic actions applied to it, each with its time in ms
+# since the game started (paused time excluded). Frames are rendered at a fixed rate: frame i shows the state
+# after every action due at or before i * 1000 / fps ms (frame 0 = spawn), so the video runs at game speed.
+ACTIONS = {
+    'left': lambda game: game.move(-1, 0),
+    'right': lambda game: game.move(1, 0),
+    'down': lambda game: game.move(0, 1), # Soft drop
+    'rotate': lambda game: game.rotate_piece(),
+    'hard_drop': lambda game: game.hard_drop(),
+    'fall': lambda game: game.fall(), # Automatic fall from the timer
+}
+
+KEYFRAME_INTERVAL = 256 # Actions between state snapshots; one snapshot per parallel chunk start at most
+REPLAY_FPS = 30
+
+
+class ReplayRecorder:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.seed = None
+        self.actions = []
+        self.times = [] # ms since start() for each action, paused time excluded
+        self.started_at = None
+        self.paused_at = None
+
+    def start(self, seed):
+        self.seed = seed
+        self.actions = []
+        self.times = []
+        self.started_at = self.clock()
+        self.paused_at = None
+
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = self.clock()
+
+    def resume(self):
+        if self.paused_at is not None: # Shift the start so the pause does not show up in the timeline
+            self.started_at += self.clock() - self.paused_at
+            self.paused_at = None
+
+    def record(self, action):
+        t_ms = round((self.clock() - self.started_at) * 1000)
+        self.actions.append(action)
+        self.times.append(max(t_ms, self.times[-1]) if self.times else t_ms) # Keep the timeline sorted
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({'seed': self.seed, 'actions': self.actions, 'times': self.times}, f)
+
+
+def load_replay(path, fps=REPLAY_FPS):
+    """Returns (seed, actions, times). Replays recorded without times play one action per frame."""
+    with open(path) as f:
+        data = json.load(f)
+    actions = data['actions']
+    times = data.get('times')
+    if times is None:
+        times = [i * 1000 / fps for i in range(1, len(actions) + 1)]
+    return data['seed'], actions, times
+
+
+def apply_action(game, action):
+    ACTIONS[action](game)
+
+
+def frame_signature(game):
+    """Cheap per-frame change check: the board only changes when a piece locks (pieces_locked changes)."""
+    piece = game.current_piece
+    return (game.pieces_locked, piece.name, piece.x, piece.y, piece.rotation_index, game.paused, game.game_over)
+
+
+def build_keyframes(seed, actions, interval=KEYFRAME_INTERVAL):
+    """Runs the logic only (no drawing) and returns {frame_index: state} every `interval` frames."""
+    game = TetrisGame(seed)
+    keyframes = {0: game.get_state()}
+    for i, action in enumerate(actions, start=1):
+        apply_action(game, action)
+        if i % interval == 0:
+            keyframes[i] = game.get_state()
+    return keyframes
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+class FrameRenderer:
+    """Draws TetrisGame states into an offscreen surface and returns raw RGB bytes at (width, height)."""
+    def __init__(self, size=(PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT)):
+        self.pygame = lazy_import("pygame") # Surfaces need no display or pygame.init()
+        self.size = size
+        self.native = self.pygame.Surface((PYGAME_SURFACE_WIDTH, PYGAME_SURFACE_HEIGHT))
+        self.scaled = None if size == self.native.get_size() else self.pygame.Surface(size)
+
+    def render(self, game):
+        game.draw(self.native)
+        if self.scaled is None:
+            return self.pygame.image.tostring(self.native, "RGB")
+        self.pygame.transform.scale(self.native, self.size, self.scaled) # Nearest neighbour keeps blocks sharp
+        return self.pygame.image.tostring(self.scaled, "RGB")
+
+
+def frame_count_for(times, fps):
+    """Frames needed to show every action: frame 0 (spawn) up to the frame the last action is due in."""
+    return int(times[-1] * fps // 1000) + 1 if times else 1
+
+
+def actions_due(times, frame_index, fps):
+    """Number of actions applied by the time frame_index is shown."""
+    return bisect_right(times, frame_index * 1000 / fps)
+
+
+def render_frames(seed, actions, times, start, stop, keyframes, size, fps=REPLAY_FPS):
+    """Yields (frame_index, rgb_bytes) for frames [start, stop), re-using the last bytes for unchanged frames."""
+    applied = actions_due(times, start, fps)
+    keyframe_index = max(k for k in keyframes if k <= applied)
+    game = TetrisGame(seed)
+    game.set_state(keyframes[keyframe_index])
+    for action in actions[keyframe_index:applied]: # Fast-forward logic only from the nearest keyframe
+        apply_action(game, action)
+
+    renderer = FrameRenderer(size)
+    frame_ms = 1000 / fps
+    last_signature = None
+    last_frame = None
+    for frame_index in range(start, stop):
+        frame_time = frame_index * frame_ms
+        while applied < len(actions) and times[applied] <= frame_time: # Everything due before this frame
+            apply_action(game, actions[applied])
+            applied += 1
+        signature = frame_signature(game) # Most frames between key presses and gravity ticks repeat the last one
+        if signature != last_signature:
+            last_frame = renderer.render(game)
+            last_signature = signature
+        yield frame_index, last_frame
+
+
+class MmapFrameSink:
+    """Pre-sized raw rgb24 file; frame i lives at offset i * frame_bytes so workers can write independently."""
+    def __init__(self, path, frame_count, frame_bytes, create=True):
+        self.frame_bytes = frame_bytes
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(frame_count * frame_bytes)
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), frame_count * frame_bytes)
+
+    def write(self, frame_index, data):
+        offset = frame_index * self.frame_bytes
+        self.map[offset:offset + self.frame_bytes] = data
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+class PipeFrameSink:
+    """Sequential raw rgb24 stream, e.g. stdout into `ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -i -`."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, frame_index, data):
+        self.stream.write(data)
+
+    def close(self):
+        self.stream.flush()
+
+
+def _render_chunk(seed, actions, times, start, stop, keyframes, size, fps, path, frame_count):
+    frame_bytes = size[0] * size[1] * 3
+    sink = MmapFrameSink(path, frame_count, frame_bytes, create=False)
+    try:
+        for frame_index, data in render_frames(seed, actions, times, start, stop, keyframes, size, fps):
+            sink.write(frame_index, data)
+    finally:
+        sink.close()
+    return stop - start
+
+
+def render_replay(seed, actions, times, size, out_path=None, stream=None, workers=1,
+                  keyframe_interval=KEYFRAME_INTERVAL, fps=REPLAY_FPS):
+    """Renders a replay at `fps` to `out_path` (memory-mapped, parallel) or to `stream` (sequential)."""
+    frame_count = frame_count_for(times, fps)
+    keyframes = build_keyframes(seed, actions, keyframe_interval)
+
+    if stream is not None:
+        sink = PipeFrameSink(stream)
+        with contextlib.redirect_stdout(sys.stderr): # Keep game/pygame prints out of the frame stream
+            for frame_index, data in render_frames(seed, actions, times, 0, frame_count, keyframes, size, fps):
+                sink.write(frame_index, data)
+        sink.close()
+        return frame_count
+
+    MmapFrameSink(out_path, frame_count, size[0] * size[1] * 3).close() # Pre-size the file once
+    # Chunks start at the first frame showing each keyframe's state, so no worker fast-forwards more than
+    # the actions due in a single frame
+    starts = sorted({0} | {int(-(-times[k - 1] * fps // 1000)) for k in keyframes if k}) # ceil(time * fps / 1000)
+    bounds = [start for start in starts if start < frame_count] + [frame_count]
+    chunks = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+    if workers <= 1:
+        for start, stop in chunks:
+            _render_chunk(seed, actions, times, start, stop, keyframes, size, fps, out_path, frame_count)
+        return frame_count
+
+    from concurrent.futures import ProcessPoolExecutor # Only the parallel path needs it; main.py imports this module
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for start, stop in chunks:
+            keyframe_index = max(k for k in keyframes if k <= actions_due(times, start, fps))
+            futures.append(pool.submit(_render_chunk, seed, actions, times, start, stop,
+                                       {keyframe_index: keyframes[keyframe_index]}, size, fps, out_path, frame_count))
+        for future in futures:
+            future.result() # Re-raise worker errors
+    return frame_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a recorded Tetris game to raw rgb24 frames.")
+    parser.add_argument("replay", help="Replay file written by main.py --record-dir")
+    parser.add_argument("--out", help="Raw frame file (memory-mapped). Omit to stream frames to stdout.")
+    parser.add_argument("--size", default=f"{PYGAME_SURFACE_WIDTH}x{PYGAME_SURFACE_HEIGHT}", help="WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    parser.add_argument("--fps", type=int, default=REPLAY_FPS, help="Output frame rate (pass the same -r to ffmpeg)")
+    args = parser.parse_args(argv)
+
+    seed, actions, times = load_replay(args.replay, args.fps)
+    size = parse_size(args.size)
+    if args.out:
+        frame_count = render_replay(seed, actions, times, size, out_path=args.out, workers=args.workers,
+                                    keyframe_interval=args.keyframe_interval, fps=args.fps)
+        print(f"Wrote {frame_count} frames ({size[0]}x{size[1]} rgb24, {args.fps} fps) to {args.out}", file=sys.stderr)
+    else:
+        render_replay(seed, actions, times, size, stream=sys.stdout.buffer,
+                      keyframe_interval=args.keyframe_interval, fps=args.fps)
+
+
+if __name__ == "__main__":
+    main()
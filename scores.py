@@ -0,0 +1,409 @@
+# scores.py
+# (YYYY-MM-DD): 2026-10-19 - Persistent high-score/statistics store: append-only binary log + compact index
+# (YYYY-MM-DD): 2026-10-19 - Index checkpoints as append-only segments merged in the background; log compaction
+
+import heapq
+import os
+import queue
+import re
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from config import *
+
+PIECE_ORDER = tuple(TETROMINO_SHAPES) # Column order of the piece counts inside a record
+
+GameRecord = namedtuple('GameRecord', ['player', 'score', 'lines', 'level', 'duration_ms', 'seed',
+                                       'piece_counts', 'timestamp'])
+
+# Fixed-size records, so record n lives at byte n * RECORD_SIZE and can be read with one seek.
+# timestamp, score, lines, level, duration_ms, seed, 7 piece counts, player (utf-8, NUL padded)
+RECORD_STRUCT = struct.Struct("<dQIIIQ7I32s")
+RECORD_SIZE = RECORD_STRUCT.size
+
+# Index segment: the index for records [start, stop) only. Header, then the (score, record_no) pairs of those
+# records that are in the global top-K, then per-player (score, record_no) columns for the range.
+SEGMENT_MAGIC = b"TSSG"
+SEGMENT_VERSION = 1
+SEGMENT_HEADER = struct.Struct("<4sIQQII") # magic, version, start, stop, top-K entries, players
+PLAYER_HEADER = struct.Struct("<HQ") # name length, record count
+SEGMENT_NAME = re.compile(r"^scores-(\d+)-(\d+)\.seg$")
+
+def stored_player_name(player):
+    """The name as it reads back from a record (truncated to 32 utf-8 bytes)."""
+    return player.encode("utf-8")[:32].decode("utf-8", errors="ignore")
+
+def pack_record(record):
+    player = stored_player_name(record.player).encode("utf-8")
+    counts = [record.piece_counts.get(name, 0) for name in PIECE_ORDER]
+    return RECORD_STRUCT.pack(record.timestamp, record.score, record.lines, record.level, record.duration_ms,
+                              record.seed or 0, *counts, player)
+
+def unpack_record(data):
+    fields = RECORD_STRUCT.unpack(data)
+    timestamp, score, lines, level, duration_ms, seed = fields[:6]
+    piece_counts = dict(zip(PIECE_ORDER, fields[6:13]))
+    player = fields[13].rstrip(b"\0").decode("utf-8", errors="ignore")
+    return GameRecord(player, score, lines, level, duration_ms, seed, piece_counts, timestamp)
+
+
+def write_segment(path, start, stop, top, players):
+    """Writes a segment atomically; `players` maps name -> (scores, record_nos) arrays for [start, stop)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, start, stop, len(top), len(players)))
+        array('Q', [value for pair in top for value in pair]).tofile(f)
+        for name, (scores, record_nos) in players.items():
+            encoded = name.encode("utf-8")
+            f.write(PLAYER_HEADER.pack(len(encoded), len(scores)))
+            f.write(encoded)
+            scores.tofile(f)
+            record_nos.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def read_segment(path):
+    """Returns (start, stop, top pairs, {player: (scores, record_nos)})."""
+    with open(path, "rb") as f:
+        magic, version, start, stop, top_len, player_count = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            raise ValueError("foreign index segment")
+        flat = array('Q')
+        flat.fromfile(f, 2 * top_len)
+        top = list(zip(flat[0::2], flat[1::2]))
+        players = {}
+        for _ in range(player_count):
+            name_len, record_count = PLAYER_HEADER.unpack(f.read(PLAYER_HEADER.size))
+            name = f.read(name_len).decode("utf-8")
+            scores, record_nos = array('Q'), array('Q')
+            scores.fromfile(f, record_count)
+            record_nos.fromfile(f, record_count)
+            players[name] = (scores, record_nos)
+    return start, stop, top, players
+
+def merge_players(target, players):
+    """Appends the columns of a later range to `target` (record numbers stay ascending)."""
+    for name, (scores, record_nos) in players.items():
+        columns = target.get(name)
+        if columns is None:
+            target[name] = (array('Q', scores), array('Q', record_nos))
+        else:
+            columns[0].extend(scores)
+            columns[1].extend(record_nos)
+
+
+class ScoreStore:
+    """Finished games are appended to `scores.log` by a writer thread, so submit() never blocks the Tk loop.
+
+    Queries are answered from an in-memory index (global top-K heap, per-player score/record columns) plus
+    one seek per returned record. The index is checkpointed by a background thread as append-only segments,
+    each covering only the records since the previous one, so a checkpoint costs the new records rather
+    than the whole index. Adjacent segments of similar size are merged in the background (every record is
+    rewritten O(log n) times in total), and opening the store reads the segments and scans only the log
+    tail after them, on the writer thread, so constructing the store costs nothing at startup. Once the log
+    passes max_log_records it is compacted to the records any query can still return; when those alone
+    are close to the limit, the next compaction waits until the log has doubled again.
+    """
+    def __init__(self, directory=SCORE_STORE_DIR, top_k=SCORE_INDEX_TOP_K, compact_every=SCORE_COMPACT_EVERY,
+                 max_log_records=SCORE_LOG_MAX_RECORDS, keep_per_player=SCORE_LOG_KEEP_PER_PLAYER):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.log_path = os.path.join(directory, "scores.log")
+        self.top_k = top_k
+        self.compact_every = compact_every
+        self.max_log_records = max_log_records
+        self.keep_per_player = keep_per_player
+        self._compact_log_at = max_log_records # Raised after each log compaction, see _compact_log
+
+        self._lock = threading.Lock() # Guards the in-memory index below
+        self._top = [] # Min-heap of (score, record_no), at most top_k entries
+        self._players = {} # player -> (array('Q') scores, array('Q') record numbers)
+        self._count = 0 # Records in the log and in the index
+        self._checkpointed = 0 # Records covered by index segments on disk
+        self._segments = [] # (start, stop, path) of the segments on disk, contiguous from record 0
+        self._compact_io_lock = threading.Lock() # One segment writer/merger (or log compaction) at a time
+        self._records_lock = threading.Lock() # Held from index lookup to record read, and while the log is swapped
+
+        self._open_log()
+        self.ready = threading.Event() # Set once the index is loaded; queries wait for it
+        self._queue = queue.Queue()
+        self._compact_requested = threading.Event()
+        self._closing = False
+        self._writer = threading.Thread(target=self._writer_loop, name="score-store-writer", daemon=True)
+        self._compactor = threading.Thread(target=self._compactor_loop, name="score-store-compactor", daemon=True)
+        self._writer.start()
+        self._compactor.start()
+
+    # --- Public API ---
+    def submit(self, record):
+        """Queues a GameRecord for appending; returns immediately."""
+        self._queue.put(record)
+
+    def flush(self):
+        """Blocks until every submitted record is on disk and indexed (not for the Tk thread)."""
+        self._queue.join()
+
+    def count(self):
+        self.ready.wait()
+        with self._lock:
+            return self._count
+
+    def top(self, n=10):
+        """Best n games overall, highest score first. Only the best top_k are indexed: larger n raises ValueError."""
+        if n > self.top_k:
+            raise ValueError(f"top({n}) exceeds the indexed top_k={self.top_k}")
+        self.ready.wait()
+        with self._records_lock:
+            with self._lock:
+                best = heapq.nlargest(n, self._top)
+            return self._read_records(record_no for _, record_no in best)
+
+    def best_score(self):
+        self.ready.wait()
+        with self._lock:
+            return max(self._top)[0] if self._top else 0
+
+    def player_records(self, player, n=10, best=True):
+        """A player's n best games (best=True) or n most recent games, without scanning the log."""
+        self.ready.wait()
+        with self._records_lock:
+            with self._lock:
+                columns = self._players.get(player)
+                if columns is None:
+                    return []
+                scores, record_nos = columns
+                if best:
+                    chosen = heapq.nlargest(n, range(len(scores)), key=scores.__getitem__)
+                    chosen_record_nos = [record_nos[i] for i in chosen]
+                else:
+                    chosen_record_nos = list(reversed(record_nos[-n:]))
+            return self._read_records(chosen_record_nos)
+
+    def compact(self):
+        """Checkpoints the records indexed since the last checkpoint as a new segment, then merges segments."""
+        with self._compact_io_lock:
+            with self._lock: # Snapshot only the new range; array slices are memcpy, the write happens unlocked
+                start, stop = self._checkpointed, self._count
+                if start == stop:
+                    return
+                top = sorted((entry for entry in self._top if start <= entry[1] < stop), reverse=True)
+                players = {}
+                for name, (scores, record_nos) in self._players.items():
+                    first = bisect_left(record_nos, start)
+                    if first < len(record_nos):
+                        players[name] = (scores[first:], record_nos[first:])
+
+            path = self._segment_path(start, stop)
+            write_segment(path, start, stop, top, players)
+            self._segments.append((start, stop, path))
+            with self._lock:
+                self._checkpointed = stop
+            self._merge_segments()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        self._closing = True
+        self._compact_requested.set()
+        self._compactor.join()
+        self._log.close()
+        if self._checkpointed != self._count:
+            self.compact()
+
+    # --- Internals ---
+    def _segment_path(self, start, stop):
+        return os.path.join(self.directory, f"scores-{start:012d}-{stop:012d}.seg")
+
+    def _merge_segments(self):
+        """Merges the two newest segments while the older is not much bigger (caller holds _compact_io_lock)."""
+        while len(self._segments) >= 2:
+            (start_a, stop_a, path_a), (start_b, stop_b, path_b) = self._segments[-2:]
+            if stop_a - start_a > SCORE_SEGMENT_MERGE_RATIO * (stop_b - start_b):
+                return
+            _, _, top, players = read_segment(path_a)
+            _, _, top_b, players_b = read_segment(path_b)
+            merge_players(players, players_b)
+            # A record outside the global top-K can never re-enter it, so the union of the tops is enough
+            top = heapq.nlargest(self.top_k, top + top_b)
+            path = self._segment_path(start_a, stop_b)
+            write_segment(path, start_a, stop_b, top, players)
+            self._segments[-2:] = [(start_a, stop_b, path)]
+            for old_path in (path_a, path_b): # A crash before this leaves overlaps, resolved on the next load
+                os.remove(old_path)
+
+    def _open_log(self):
+        # Drop a torn trailing record (e.g. power loss mid-append) so record numbers stay aligned
+        if os.path.exists(self.log_path):
+            size = os.path.getsize(self.log_path)
+            if size % RECORD_SIZE:
+                with open(self.log_path, "r+b") as f:
+                    f.truncate(size - size % RECORD_SIZE)
+        self._log = open(self.log_path, "ab")
+
+    def _index_record(self, record_no, score, player):
+        entry = (score, record_no)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+        columns = self._players.get(player)
+        if columns is None:
+            columns = self._players[player] = (array('Q'), array('Q'))
+        columns[0].append(score)
+        columns[1].append(record_no)
+
+    def _load_index(self):
+        log_records = os.path.getsize(self.log_path) // RECORD_SIZE
+        self._load_segments(log_records)
+        self._scan_log(self._count, log_records)
+
+    def _load_segments(self, log_records):
+        """Chains segments from record 0 (widest first where merges overlapped) and drops the rest."""
+        found = {}
+        for name in os.listdir(self.directory):
+            match = SEGMENT_NAME.match(name)
+            if match:
+                found[(int(match.group(1)), int(match.group(2)))] = os.path.join(self.directory, name)
+
+        position = 0
+        top = []
+        while True:
+            candidates = [stop for start, stop in found if start == position and stop <= log_records]
+            if not candidates:
+                break
+            stop = max(candidates)
+            path = found.pop((position, stop))
+            try:
+                _, _, segment_top, players = read_segment(path)
+            except (OSError, ValueError, EOFError, struct.error, UnicodeDecodeError):
+                found[(position, stop)] = path # Unusable: removed below, the log tail scan covers its records
+                break
+            top.extend(segment_top)
+            merge_players(self._players, players)
+            self._segments.append((position, stop, path))
+            position = stop
+        for path in found.values(): # Merge inputs left by a crash, or segments past a gap
+            os.remove(path)
+
+        self._top = heapq.nlargest(self.top_k, top)
+        heapq.heapify(self._top)
+        self._count = self._checkpointed = position
+
+    def _scan_log(self, start, stop):
+        """Indexes records [start, stop) of the log; only the tail after the segments on a normal open."""
+        chunk_records = 4096
+        with open(self.log_path, "rb") as f:
+            f.seek(start * RECORD_SIZE)
+            record_no = start
+            while record_no < stop:
+                data = f.read(min(chunk_records, stop - record_no) * RECORD_SIZE)
+                for fields in RECORD_STRUCT.iter_unpack(data):
+                    self._index_record(record_no, fields[1], fields[13].rstrip(b"\0").decode("utf-8", errors="ignore"))
+                    record_no += 1
+        self._count = stop
+
+    def _read_records(self, record_nos):
+        records = []
+        with open(self.log_path, "rb") as f:
+            for record_no in record_nos:
+                f.seek(record_no * RECORD_SIZE)
+                records.append(unpack_record(f.read(RECORD_SIZE)))
+        return records
+
+    def _compact_log(self):
+        """Rewrites the log keeping the global top-K and each player's best and latest games (writer thread).
+
+        Record numbers change, so the old segments are deleted before the new log replaces the old one; a
+        crash in between leaves a log without segments, which the next open simply re-indexes. The next
+        compaction waits until the log is at least twice the kept records, so a kept set near (or past)
+        max_log_records cannot turn every later submit into a full rewrite.
+        """
+        keep_n = self.keep_per_player
+        with self._compact_io_lock:
+            with self._lock:
+                keep = {record_no for _, record_no in self._top}
+                for scores, record_nos in self._players.values():
+                    keep.update(record_nos[i] for i in heapq.nlargest(keep_n, range(len(scores)), key=scores.__getitem__))
+                    keep.update(record_nos[-keep_n:])
+            kept = sorted(keep)
+
+            self._log.flush()
+            tmp_path = self.log_path + ".tmp"
+            top, players = [], {}
+            with open(self.log_path, "rb") as src, open(tmp_path, "wb") as dst:
+                for new_no, record_no in enumerate(kept):
+                    src.seek(record_no * RECORD_SIZE)
+                    data = src.read(RECORD_SIZE)
+                    dst.write(data)
+                    fields = RECORD_STRUCT.unpack(data)
+                    entry = (fields[1], new_no)
+                    if len(top) < self.top_k:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+                    name = fields[13].rstrip(b"\0").decode("utf-8", errors="ignore")
+                    columns = players.get(name)
+                    if columns is None:
+                        columns = players[name] = (array('Q'), array('Q'))
+                    columns[0].append(fields[1])
+                    columns[1].append(new_no)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            with self._records_lock: # No query reads records while the numbering changes
+                for _, _, path in self._segments:
+                    os.remove(path)
+                self._segments = []
+                self._log.close()
+                os.replace(tmp_path, self.log_path)
+                self._log = open(self.log_path, "ab")
+                with self._lock:
+                    self._top, self._players = top, players
+                    self._count = len(kept)
+                    self._checkpointed = 0
+            self._compact_log_at = max(self.max_log_records, 2 * len(kept))
+        self._compact_requested.set() # Checkpoint the new log as a single segment in the background
+        print(f"Score log compacted to {len(kept)} records")
+
+    def _writer_loop(self):
+        try:
+            with self._lock:
+                self._load_index()
+        finally:
+            self.ready.set() # Never leave queries waiting, even on an unreadable log
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                data = pack_record(record)
+                self._log.write(data)
+                self._log.flush() # Visible to _read_records as soon as it is indexed
+                with self._lock:
+                    record_no = self._count
+                    self._index_record(record_no, record.score, stored_player_name(record.player))
+                    self._count += 1
+                    pending = self._count - self._checkpointed
+                    count = self._count
+                if self.max_log_records and count > self._compact_log_at:
+                    self._compact_log()
+                elif pending >= self.compact_every:
+                    self._compact_requested.set()
+            except Exception as e:
+                print(f"Error writing score record: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _compactor_loop(self):
+        while True:
+            self._compact_requested.wait()
+            self._compact_requested.clear()
+            if self._closing:
+                return
+            try:
+                self.compact()
+            except OSError as e:
+                print(f"Error compacting score index: {e}")
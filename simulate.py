@@ -0,0 +1,114 @@
+# simulate.py
+# (YYYY-MM-DD): 2026-10-19 - Headless game simulation with a greedy bot, yielding game event streams
+
+import random
+from contextlib import redirect_stdout
+from config import *
+from game import TetrisGame
+
+class _NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+_NULL_WRITER = _NullWriter()
+
+# Heuristic weights for the bot (aggregate height, holes, bumpiness, completed lines)
+BOT_WEIGHTS = (-0.51, -0.36, -0.18, 0.76)
+
+
+def _collides(grid, coords, x, y):
+    for r_local, c_local in coords:
+        r, c = y + r_local, x + c_local
+        if not (0 <= c < GRID_COLS and 0 <= r < GRID_ROWS) or grid[r][c] is not None:
+            return True
+    return False
+
+
+def _evaluate(grid, coords, x, y):
+    """Scores the board after placing `coords` at (x, y); never mutates `grid`."""
+    placed = {(y + r_local, x + c_local) for r_local, c_local in coords}
+    full_rows = sum(1 for r in range(GRID_ROWS)
+                    if all(grid[r][c] is not None or (r, c) in placed for c in range(GRID_COLS)))
+    heights = []
+    holes = 0
+    for c in range(GRID_COLS):
+        top = None
+        for r in range(GRID_ROWS):
+            filled = grid[r][c] is not None or (r, c) in placed
+            if filled and top is None:
+                top = r
+            elif not filled and top is not None:
+                holes += 1
+        heights.append(GRID_ROWS - top if top is not None else 0)
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(GRID_COLS - 1))
+    w_height, w_holes, w_bump, w_lines = BOT_WEIGHTS
+    return w_height * sum(heights) + w_holes * holes + w_bump * bumpiness + w_lines * full_rows
+
+
+def choose_placement(game, rng, noise=0.0):
+    """Returns (rotations, target_x) for the current piece, picked by the heuristic plus optional noise."""
+    piece = game.current_piece
+    best = None
+    for rotations in range(piece.num_distinct_rotations if piece.name != 'O' else 1):
+        coords = piece.all_rotations[(piece.rotation_index + rotations) % piece.num_distinct_rotations]
+        min_c = min(c for _, c in coords)
+        max_c = max(c for _, c in coords)
+        for x in range(-min_c, GRID_COLS - max_c):
+            y = piece.y
+            if _collides(game.grid, coords, x, y):
+                continue
+            while not _collides(game.grid, coords, x, y + 1):
+                y += 1
+            value = _evaluate(game.grid, coords, x, y) + (rng.random() * noise if noise else 0.0)
+            if best is None or value > best[0]:
+                best = (value, rotations, x)
+    return (0, piece.x) if best is None else best[1:]
+
+
+def simulate_game(seed, noise=0.5, max_pieces=None):
+    """Plays one game with the bot and yields its events lazily, as they happen.
+
+    Besides the TetrisGame events (see game.py) the stream contains ('fall', fall_delay_ms) for every
+    gravity step, so consumers can rebuild game time without a clock, and ends with
+    ('truncated', score, lines_cleared_total, level) instead of 'game_over' when max_pieces cut it short.
+    """
+    game = TetrisGame(seed)
+    rng = random.Random(seed)
+    pending = []
+    game.event_listeners.append(pending.append)
+
+    while not game.game_over and (max_pieces is None or game.pieces_locked < max_pieces):
+        # Redirect per piece, never across a yield, so the consumer's own prints are unaffected
+        with redirect_stdout(_NULL_WRITER): # Silence level-up prints
+            play_piece(game, rng, noise, pending)
+        yield from pending
+        pending.clear()
+    if not game.game_over:
+        yield ('truncated', game.score, game.lines_cleared_total, game.level)
+
+
+def play_piece(game, rng, noise, pending):
+    rotations, target_x = choose_placement(game, rng, noise)
+    for _ in range(rotations):
+        game.rotate_piece()
+    while game.current_piece.x != target_x:
+        if not game.move(1 if target_x > game.current_piece.x else -1, 0):
+            break # Blocked; drop where we are
+    for _ in range(rng.randrange(3)): # Let gravity act a little, like a human deciding
+        pending.append(('fall', game.fall_delay))
+        locks_before = game.pieces_locked
+        game.fall()
+        if game.pieces_locked != locks_before or game.game_over:
+            break
+    else:
+        game.hard_drop()
+
+
+def simulate_games(seeds, noise=0.5, max_pieces=None):
+    """Chains the event streams of many games; ('game_start', seed) separates them."""
+    for seed in seeds:
+        yield ('game_start', seed)
+        yield from simulate_game(seed, noise, max_pieces)
@@ -0,0 +1,51 @@
+# startup.py
+# (YYYY-MM-DD): 2026-10-19 - Startup timing: lazy heavy imports and time-to-first-frame report
+
+import importlib
+import os
+import sys
+import time
+
+class StartupTimer:
+    """Records import costs and startup milestones relative to process start (t0)."""
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.imports = [] # (module_name, seconds) for modules loaded through import_module()
+        self.marks = [] # (label, seconds since t0)
+        self.enabled = bool(os.environ.get("TETRIS_STARTUP_REPORT"))
+
+    def import_module(self, name):
+        module = sys.modules.get(name)
+        if module is not None: # Already loaded, just a dict lookup
+            return module
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append((name, time.perf_counter() - start))
+        return module
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.t0))
+
+    def elapsed(self, label):
+        for mark_label, seconds in self.marks:
+            if mark_label == label:
+                return seconds
+        return None
+
+    def report(self):
+        """Returns an `-X importtime`-style table: lazy import costs, then cumulative milestones."""
+        lines = ["import time: cumulative [us] | module"]
+        for name, seconds in self.imports:
+            lines.append(f"import time: {int(seconds * 1e6):>15} | {name}")
+        lines.append("")
+        lines.append("startup:     since t0 [ms] | milestone")
+        for label, seconds in self.marks:
+            lines.append(f"startup:     {seconds * 1000:>13.1f} | {label}")
+        return "\n".join(lines)
+
+
+TIMER = StartupTimer()
+
+def lazy_import(name):
+    """Imports `name` on first use and records how long it took."""
+    return TIMER.import_module(name)
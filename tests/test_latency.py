@@ -0,0 +1,24 @@
+# tests/test_latency.py
+# (YYYY-MM-DD): 2026-10-19 - Headless input-latency regression check (no Tk or display needed)
+
+import unittest
+from config import *
+from latency import run_headless_harness
+
+MAX_OVER_BUDGET = 0.05 # Fraction of frames allowed over LATENCY_BUDGET_MS before the check fails
+
+
+class HeadlessLatencyTest(unittest.TestCase):
+    def test_key_to_frame_latency_within_budget(self):
+        tracer = run_headless_harness(presses=200, interval_ms=30, budget_ms=LATENCY_BUDGET_MS, seed=0)
+        self.assertGreater(tracer.frames(), 0)
+        self.assertLessEqual(tracer.over_budget_ratio(), MAX_OVER_BUDGET, tracer.report())
+
+    def test_every_stage_is_stamped(self):
+        tracer = run_headless_harness(presses=20, seed=1)
+        stages = {stage for _, stage in tracer.stage_stats}
+        self.assertTrue({'logic', 'draw', 'convert', 'widgets', 'displayed'} <= stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# tests/test_scoring.py
+# (YYYY-MM-DD): 2026-10-19 - T-spin, back-to-back, combo and perfect-clear scoring checks on hand-built boards
+
+import unittest
+from config import *
+from game import TetrisGame, Tetromino, GARBAGE_ID, T_CORNERS, T_FRONT_CORNERS
+
+
+class ScoringTest(unittest.TestCase):
+    def setUp(self):
+        self.game = TetrisGame(seed=1)
+        self.events = []
+        self.game.event_listeners.append(self.events.append)
+
+    def fill(self, cells):
+        """Marks cells as garbage in both the grid and the board, keeping filled_cells in step."""
+        game = self.game
+        for r, c in cells:
+            if game.grid[r][c] is None:
+                game.grid[r][c] = GARBAGE_COLOR
+                game.board[r * GRID_COLS + c] = GARBAGE_ID
+                game.filled_cells += 1
+
+    def fill_rows(self, rows, except_cols):
+        self.fill((r, c) for r in rows for c in range(GRID_COLS) if c not in except_cols)
+
+    def place(self, name, rotation_index, x, y):
+        piece = Tetromino(name, position_offset=(x, y))
+        piece.rotation_index = rotation_index
+        piece.current_shape_coords = piece.all_rotations[rotation_index]
+        self.game.current_piece = piece
+        return piece
+
+    def drop(self):
+        """Hard-drops the current piece (already resting, so no drop points); returns (score delta, 'clear' events)."""
+        self.events.clear()
+        score_before = self.game.score
+        self.game.hard_drop()
+        return self.game.score - score_before, [event for event in self.events if event[0] == 'clear']
+
+    def drop_i_in_left_well(self):
+        self.place('I', 1, -2, GRID_ROWS - 4) # Vertical I (column 2 of its box) resting in column 0
+        return self.drop()
+
+    def assert_filled_cells_consistent(self):
+        self.assertEqual(self.game.filled_cells, sum(1 for cell in self.game.board if cell))
+
+    def test_t_spin_double(self):
+        # Slot for a T pointing down at rows 18-19, column 4, with an overhang at (17, 3)
+        self.fill_rows([18], except_cols=(3, 4, 5))
+        self.fill_rows([19], except_cols=(4,))
+        self.fill([(17, 3)])
+        piece = self.place('T', 1, 3, 17)
+        self.game.rotate_piece() # 1 -> 2 with the first kick test
+        self.assertEqual((piece.rotation_index, piece.last_kick_index), (2, 0))
+        self.assertEqual(self.game.detect_t_spin(), 'full')
+
+        delta, clears = self.drop()
+        self.assertEqual(clears, [('clear', 't_spin_double', 2, False, 0, False, SCORE_T_SPIN[2])])
+        self.assertEqual(delta, SCORE_T_SPIN[2])
+        self.assertTrue(self.game.back_to_back)
+        self.assert_filled_cells_consistent()
+
+    def test_t_spin_mini_single(self):
+        # T pointing up over a one-cell hole: both back corners and only one front corner occupied
+        self.fill_rows([18], except_cols=(3, 4, 5))
+        self.fill_rows([19], except_cols=(4,))
+        self.fill([(17, 3)])
+        piece = self.place('T', 3, 3, 17)
+        self.game.rotate_piece() # 3 -> 0 with the first kick test
+        self.assertEqual((piece.rotation_index, piece.last_kick_index), (0, 0))
+        self.assertEqual(self.game.detect_t_spin(), 'mini')
+
+        delta, clears = self.drop()
+        self.assertEqual(clears, [('clear', 't_spin_mini_single', 1, False, 0, False, SCORE_T_SPIN_MINI[1])])
+        self.assertEqual(delta, SCORE_T_SPIN_MINI[1])
+        self.assert_filled_cells_consistent()
+
+    def test_front_corners_face_the_t_nub(self):
+        for rotation_index, coords in enumerate(TETROMINO_SHAPES['T']):
+            arms = [(r - 1, c - 1) for r, c in coords if (r, c) != (1, 1)] # Offsets from the pivot
+            nub = next(arm for arm in arms if (-arm[0], -arm[1]) not in arms) # The arm without an opposite
+            front = {T_CORNERS[i] for i in T_FRONT_CORNERS[rotation_index]}
+            self.assertEqual(front, {corner for corner in T_CORNERS
+                                     if corner[0] == nub[0] or corner[1] == nub[1]}, rotation_index)
+
+    def test_last_kick_upgrades_mini(self):
+        self.fill_rows([18], except_cols=(3, 4, 5))
+        self.fill_rows([19], except_cols=(4,))
+        self.fill([(17, 3)])
+        piece = self.place('T', 0, 3, 17)
+        piece.last_kick_index = T_SPIN_UPGRADE_KICK_INDEX
+        self.assertEqual(self.game.detect_t_spin(), 'full')
+
+    def test_moving_after_rotation_is_not_a_spin(self):
+        piece = self.place('T', 0, 3, 5)
+        self.game.rotate_piece()
+        self.assertEqual(piece.last_kick_index, 0)
+        self.assertTrue(self.game.move(1, 0)) # Any successful move after the rotation cancels the spin
+        self.assertIsNone(piece.last_kick_index)
+        self.assertIsNone(self.game.detect_t_spin())
+
+    def test_back_to_back_tetris_survives_a_non_clearing_lock(self):
+        self.fill([(10, 5)]) # Keeps both tetrises from being perfect clears
+        self.fill_rows(range(16, 20), except_cols=(0,))
+        delta, clears = self.drop_i_in_left_well()
+        self.assertEqual(clears, [('clear', 'tetris', 4, False, 0, False, SCORE_PER_LINE[4])])
+        self.assertEqual(delta, SCORE_PER_LINE[4])
+
+        self.place('O', 0, 7, GRID_ROWS - 2) # Locks without clearing: ends the combo, keeps back-to-back
+        self.drop()
+        self.assertEqual(self.game.combo, -1)
+        self.assertTrue(self.game.back_to_back)
+
+        self.fill_rows(range(16, 20), except_cols=(0,))
+        delta, clears = self.drop_i_in_left_well()
+        expected = int(SCORE_PER_LINE[4] * BACK_TO_BACK_MULTIPLIER)
+        self.assertEqual(clears, [('clear', 'tetris', 4, True, 0, False, expected)])
+        self.assertEqual(delta, expected)
+        self.assert_filled_cells_consistent()
+
+    def test_combo_and_back_to_back_break(self):
+        self.fill([(14, 5)])
+        self.fill_rows(range(16, 20), except_cols=(0,))
+        self.drop_i_in_left_well() # Tetris: back-to-back armed, combo 0
+        self.fill_rows([19], except_cols=(0,))
+        self.fill_rows([18], except_cols=(0, 1))
+        self.place('O', 0, -1, GRID_ROWS - 2) # Only row 19 completes: a single right after the tetris
+        delta, clears = self.drop()
+        self.assertEqual(clears, [('clear', 'single', 1, False, 1, False, SCORE_PER_LINE[1] + SCORE_COMBO)])
+        self.assertEqual(delta, SCORE_PER_LINE[1] + SCORE_COMBO)
+        self.assertFalse(self.game.back_to_back) # A single breaks the chain
+        self.assert_filled_cells_consistent()
+
+    def test_perfect_clear(self):
+        self.fill_rows(range(16, 20), except_cols=(0,))
+        delta, clears = self.drop_i_in_left_well()
+        expected = SCORE_PER_LINE[4] + SCORE_PERFECT_CLEAR[4]
+        self.assertEqual(clears, [('clear', 'tetris', 4, False, 0, True, expected)])
+        self.assertEqual(delta, expected)
+        self.assertEqual(self.game.filled_cells, 0)
+        self.assertIn(CLEAR_REWARDS['perfect_clear'], self.game.check_and_trigger_rewards())
+
+    def test_filled_cells_through_garbage(self):
+        self.fill_rows([19], except_cols=(0, 1, 2))
+        self.game.add_garbage(3, hole_col=4)
+        self.assert_filled_cells_consistent()
+        self.game.hard_drop()
+        self.assert_filled_cells_consistent()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,13 @@
 # ui.py
 # (YYYY-MM-DD): 2025-05-10 - CustomTkinter UI elements for Tetris
 # (YYYY-MM-DD): 2025-05-11 - Refined next_piece drawing, added rewards display label
+# (YYYY-MM-DD): 2026-10-19 - Shared font cache, achievements/instructions built after first frame, lazy PIL
+# (YYYY-MM-DD): 2026-10-19 - Game over dialog shows the stored best score
+# (YYYY-MM-DD): 2026-10-19 - update_game_canvas stamps latency traces (convert/commit)
 
 import customtkinter as ctk
-from PIL import Image # No ImageTk needed if using CTkImage directly with PIL.Image
 from config import *
+from startup import lazy_import
 
 class TetrisUI(ctk.CTk):
     def __init__(self, game_instance_provider, start_game_cb, pause_game_cb, reset_game_cb, handle_input_cb):
@@ -15,6 +18,7 @@ class TetrisUI(ctk.CTk):
         self.pause_game_callback = pause_game_cb
         self.reset_game_callback = reset_game_cb
         self.handle_input_callback = handle_input_cb
+        self._fonts = {} # (size, weight) -> CTkFont, see font()
 
         self.title("CTk Sharp Tetris")
         self.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
@@ -39,21 +43,21 @@ class TetrisUI(ctk.CTk):
         self.info_frame.grid_propagate(False)
 
         # Score
-        self.score_label_title = ctk.CTkLabel(self.info_frame, text="Score", font=ctk.CTkFont(size=20, weight="bold"))
+        self.score_label_title = ctk.CTkLabel(self.info_frame, text="Score", font=self.font(20, "bold"))
         self.score_label_title.pack(pady=(15,0), padx=10)
         self.score_var = ctk.StringVar(value="0")
-        self.score_display = ctk.CTkLabel(self.info_frame, textvariable=self.score_var, font=ctk.CTkFont(size=28))
+        self.score_display = ctk.CTkLabel(self.info_frame, textvariable=self.score_var, font=self.font(28))
         self.score_display.pack(pady=(0,10), padx=10)
 
         # Level
-        self.level_label_title = ctk.CTkLabel(self.info_frame, text="Level", font=ctk.CTkFont(size=20, weight="bold"))
+        self.level_label_title = ctk.CTkLabel(self.info_frame, text="Level", font=self.font(20, "bold"))
         self.level_label_title.pack(pady=(10,0), padx=10)
         self.level_var = ctk.StringVar(value="1")
-        self.level_display = ctk.CTkLabel(self.info_frame, textvariable=self.level_var, font=ctk.CTkFont(size=28))
+        self.level_display = ctk.CTkLabel(self.info_frame, textvariable=self.level_var, font=self.font(28))
         self.level_display.pack(pady=(0,10), padx=10)
 
         # Next Piece
-        self.next_piece_label_title = ctk.CTkLabel(self.info_frame, text="Next", font=ctk.CTkFont(size=18, weight="bold"))
+        self.next_piece_label_title = ctk.CTkLabel(self.info_frame, text="Next", font=self.font(18, "bold"))
         self.next_piece_label_title.pack(pady=(10,5), padx=10)
         
         # Calculate dynamic size for next piece frame based on BLOCK_SIZE
@@ -73,38 +77,52 @@ class TetrisUI(ctk.CTk):
         self.next_piece_canvas.place(relx=0.5, rely=0.5, anchor="center")
 
 
-        # Rewards Display
-        self.rewards_label_title = ctk.CTkLabel(self.info_frame, text="Achievements", font=ctk.CTkFont(size=16, weight="bold"))
-        self.rewards_label_title.pack(pady=(15,5), padx=10)
+        # Rewards Display (widgets built by build_deferred_panels)
         self.rewards_message_var = ctk.StringVar(value="Keep Playing!")
-        self.rewards_display_label = ctk.CTkLabel(self.info_frame, textvariable=self.rewards_message_var,
-                                                 font=ctk.CTkFont(size=12), wraplength=INFO_AREA_WIDTH - 20,
-                                                 justify="left")
-        self.rewards_display_label.pack(pady=(0,10), padx=10, fill="x")
 
 
         # Buttons (Grouped in a frame for better spacing)
         self.button_frame = ctk.CTkFrame(self.info_frame, fg_color="transparent")
         self.button_frame.pack(pady=15, padx=20, fill="x", side="bottom")
 
-        self.start_button = ctk.CTkButton(self.button_frame, text="Start Game", command=self.start_game_callback, font=ctk.CTkFont(size=16))
+        self.start_button = ctk.CTkButton(self.button_frame, text="Start Game", command=self.start_game_callback, font=self.font(16))
         self.start_button.pack(pady=5, fill="x", ipady=4)
 
-        self.pause_button = ctk.CTkButton(self.button_frame, text="Pause", command=self.toggle_pause_button, font=ctk.CTkFont(size=16), state="disabled")
+        self.pause_button = ctk.CTkButton(self.button_frame, text="Pause", command=self.toggle_pause_button, font=self.font(16), state="disabled")
         self.pause_button.pack(pady=5, fill="x", ipady=4)
 
-        self.reset_button = ctk.CTkButton(self.button_frame, text="Reset Game", command=self.reset_game_callback, font=ctk.CTkFont(size=16), state="disabled")
+        self.reset_button = ctk.CTkButton(self.button_frame, text="Reset Game", command=self.reset_game_callback, font=self.font(16), state="disabled")
         self.reset_button.pack(pady=5, fill="x", ipady=4)
 
-        # Instructions
-        instructions_text = "Controls:\n← Left  → Right\n↓ Soft Drop   ↑ Rotate\nSpace Hard Drop\nP Pause/Resume"
-        self.instructions_label = ctk.CTkLabel(self.info_frame, text=instructions_text, font=ctk.CTkFont(size=11), justify="center", anchor="s")
-        self.instructions_label.pack(pady=(10,5), side="bottom", fill="x", padx=10)
-
         self.bind("<KeyPress>", self.handle_input_callback)
         self.protocol("WM_DELETE_WINDOW", self.on_closing) # Handle window close
         self.game_over_dialog = None # To keep track of game over dialog
+        self.deferred_panels_built = False # GameRunner calls build_deferred_panels after the first frame
 
+    def font(self, size, weight="normal"):
+        key = (size, weight)
+        if key not in self._fonts:
+            self._fonts[key] = ctk.CTkFont(size=size, weight=weight)
+        return self._fonts[key]
+
+    def build_deferred_panels(self):
+        """Builds the panels that are not needed for the first frame (achievements, instructions)."""
+        if self.deferred_panels_built:
+            return
+        self.deferred_panels_built = True
+
+        # Rewards Display
+        self.rewards_label_title = ctk.CTkLabel(self.info_frame, text="Achievements", font=self.font(16, "bold"))
+        self.rewards_label_title.pack(pady=(15,5), padx=10)
+        self.rewards_display_label = ctk.CTkLabel(self.info_frame, textvariable=self.rewards_message_var,
+                                                 font=self.font(12), wraplength=INFO_AREA_WIDTH - 20,
+                                                 justify="left")
+        self.rewards_display_label.pack(pady=(0,10), padx=10, fill="x")
+
+        # Instructions
+        instructions_text = "Controls:\n← Left  → Right\n↓ Soft Drop   ↑ Rotate\nSpace Hard Drop\nP Pause/Resume"
+        self.instructions_label = ctk.CTkLabel(self.info_frame, text=instructions_text, font=self.font(11), justify="center", anchor="s")
+        self.instructions_label.pack(pady=(10,5), side="bottom", fill="x", padx=10)
 
     def on_closing(self):
         # Potentially save game state or settings here if needed in future
@@ -175,15 +193,18 @@ class TetrisUI(ctk.CTk):
                                                     fill=fill_color_hex, 
                                                     outline=outline_color_hex, width=1)
 
-    def update_game_canvas(self, pygame_surface):
+    def update_game_canvas(self, pygame_surface, trace=None):
+        """Pushes the surface to the game label. Returns True once an image has been committed."""
         try:
+            pygame = lazy_import("pygame")
+            Image = lazy_import("PIL.Image") # No ImageTk needed if using CTkImage directly with PIL.Image
             img_data = pygame.image.tostring(pygame_surface, "RGB")
             pil_img = Image.frombytes("RGB", pygame_surface.get_size(), img_data)
 
             frame_width = self.game_canvas_label.winfo_width()
             frame_height = self.game_canvas_label.winfo_height()
 
-            if frame_width <= 1 or frame_height <= 1: return
+            if frame_width <= 1 or frame_height <= 1: return False
 
             img_aspect = pil_img.width / pil_img.height
             frame_aspect = frame_width / frame_height
@@ -195,19 +216,25 @@ class TetrisUI(ctk.CTk):
                 new_height = frame_height
                 new_width = int(new_height * img_aspect)
             
-            if new_width <=0 or new_height <=0: return # Avoid invalid resize
+            if new_width <=0 or new_height <=0: return False # Avoid invalid resize
 
             resized_pil_img = pil_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            if trace:
+                trace.stamp('convert')
 
             self.current_ctk_image = ctk.CTkImage(light_image=resized_pil_img,
                                                   dark_image=resized_pil_img,
                                                   size=(resized_pil_img.width, resized_pil_img.height))
             self.game_canvas_label.configure(image=self.current_ctk_image)
+            if trace:
+                trace.stamp('commit')
+            return True
         except Exception as e:
             print(f"Error updating game canvas: {e}")
+            return False
 
 
-    def show_game_over_message(self, final_score):
+    def show_game_over_message(self, final_score, best_score=None):
         if self.game_over_dialog and self.game_over_dialog.winfo_exists():
             self.game_over_dialog.destroy() # Close if already open
 
@@ -217,13 +244,16 @@ class TetrisUI(ctk.CTk):
 
         self.game_over_dialog = ctk.CTkToplevel(self)
         self.game_over_dialog.title("Game Over")
-        self.game_over_dialog.geometry("300x180")
+        self.game_over_dialog.geometry("300x210")
         self.game_over_dialog.transient(self)
         self.game_over_dialog.grab_set() # Modal
         self.game_over_dialog.attributes("-topmost", True)
 
 
-        label = ctk.CTkLabel(self.game_over_dialog, text=f"Game Over!\nFinal Score: {final_score}", font=ctk.CTkFont(size=20, weight="bold"))
+        message = f"Game Over!\nFinal Score: {final_score}"
+        if best_score is not None:
+            message += f"\nBest Score: {best_score}"
+        label = ctk.CTkLabel(self.game_over_dialog, text=message, font=self.font(20, "bold"))
         label.pack(pady=20, padx=20, expand=True)
 
         ok_button = ctk.CTkButton(self.game_over_dialog, text="OK", command=self.game_over_dialog.destroy, width=100)
@@ -0,0 +1,307 @@
+# versus.py
+# (YYYY-MM-DD): 2026-10-19 - Local 2-8 player versus mode: one clock, garbage lines, batched dirty-region rendering
+
+import argparse
+import math
+import random
+import time
+from config import *
+from game import TetrisGame, PIECE_IDS, GARBAGE_ID
+from replay import apply_action
+from simulate import choose_placement
+from startup import lazy_import
+
+# Keyboard players, in order (lower-cased keysyms). Boards beyond the humans are played by bots.
+KEY_MAPS = [
+    {'a': 'left', 'd': 'right', 's': 'down', 'w': 'rotate', 'space': 'hard_drop'},
+    {'left': 'left', 'right': 'right', 'down': 'down', 'up': 'rotate', 'return': 'hard_drop'},
+    {'j': 'left', 'l': 'right', 'k': 'down', 'i': 'rotate', 'u': 'hard_drop'},
+    {'kp_4': 'left', 'kp_6': 'right', 'kp_5': 'down', 'kp_8': 'rotate', 'kp_0': 'hard_drop'},
+]
+KEY_BINDINGS = {key: (player, action) for player, key_map in enumerate(KEY_MAPS) for key, action in key_map.items()}
+
+
+class BotController:
+    """Plays one board a move at a time (every VERSUS_BOT_ACTION_MS), using the simulate.py heuristic."""
+    def __init__(self, rng, action_ms=VERSUS_BOT_ACTION_MS):
+        self.rng = rng
+        self.action_ms = action_ms
+        self.elapsed = 0
+        self.planned_for = None # pieces_locked value the current plan belongs to
+        self.rotations_left = 0
+        self.target_x = 0
+
+    def step(self, game, elapsed_ms):
+        self.elapsed += elapsed_ms
+        if self.elapsed < self.action_ms:
+            return
+        self.elapsed -= self.action_ms
+        if self.planned_for != game.pieces_locked: # New piece: plan its placement once
+            self.planned_for = game.pieces_locked
+            self.rotations_left, self.target_x = choose_placement(game, self.rng, noise=1.0)
+        if self.rotations_left:
+            self.rotations_left -= 1
+            game.rotate_piece()
+        elif game.current_piece.x != self.target_x:
+            if not game.move(1 if self.target_x > game.current_piece.x else -1, 0):
+                self.target_x = game.current_piece.x # Blocked, drop here
+        else:
+            game.hard_drop()
+
+
+class VersusMatch:
+    """Game logic for all boards, stepped together by tick(); garbage moves between boards here."""
+    def __init__(self, players, bots=0, seed=None):
+        if not 2 <= players <= VERSUS_MAX_PLAYERS:
+            raise ValueError(f"Versus mode needs 2 to {VERSUS_MAX_PLAYERS} players, got {players}")
+        self.rng = random.Random(seed)
+        piece_seed = self.rng.randrange(2**32) # Same piece sequence on every board
+        self.games = [TetrisGame(piece_seed) for _ in range(players)]
+        self.fall_elapsed = [0] * players
+        self.pending_garbage = [0] * players
+        self.bots = {index: BotController(random.Random(self.rng.random()))
+                     for index in range(players - bots, players)}
+        for index, game in enumerate(self.games):
+            game.event_listeners.append(lambda event, index=index: self.on_game_event(index, event))
+
+    def on_game_event(self, index, event):
+        if event[0] == 'lock' and event[2]:
+            garbage = VERSUS_GARBAGE_FOR_LINES[min(event[2], len(VERSUS_GARBAGE_FOR_LINES) - 1)]
+            target = self.next_alive(index)
+            if garbage and target is not None:
+                self.pending_garbage[target] += garbage
+
+    def next_alive(self, index):
+        """Garbage goes to the next board still playing, to the right, wrapping around."""
+        for step in range(1, len(self.games)):
+            candidate = (index + step) % len(self.games)
+            if not self.games[candidate].game_over:
+                return candidate
+        return None
+
+    def alive(self):
+        return [index for index, game in enumerate(self.games) if not game.game_over]
+
+    def winner(self):
+        alive = self.alive()
+        return alive[0] if len(alive) == 1 else None
+
+    def finished(self):
+        return len(self.alive()) <= 1
+
+    def apply_input(self, player, action):
+        if player < len(self.games) and player not in self.bots and not self.games[player].game_over:
+            apply_action(self.games[player], action)
+
+    def tick(self, elapsed_ms):
+        for index, game in enumerate(self.games):
+            if game.game_over:
+                continue
+            bot = self.bots.get(index)
+            if bot:
+                bot.step(game, elapsed_ms)
+            self.fall_elapsed[index] += elapsed_ms
+            while self.fall_elapsed[index] >= game.fall_delay and not game.game_over:
+                self.fall_elapsed[index] -= game.fall_delay
+                game.fall()
+        # Garbage lands after every board has moved, so the order of boards does not matter
+        for index, count in enumerate(self.pending_garbage):
+            if count:
+                self.pending_garbage[index] = 0
+                self.games[index].add_garbage(count, self.rng.randrange(GRID_COLS))
+
+
+class BoardCompositor:
+    """Draws every board into one shared surface, blitting cached block sprites for changed cells only.
+
+    update() returns the dirty rectangles (x, y, w, h) of this frame: per board, the bounding box of the
+    cells that changed plus the header when its text changed. Unchanged boards cost a 200-byte compare.
+    """
+    def __init__(self, games, max_size=VERSUS_MAX_WINDOW):
+        self.pygame = lazy_import("pygame")
+        self.games = games
+        count = len(games)
+        self.columns = min(count, 4)
+        rows = math.ceil(count / self.columns)
+        gap, header = VERSUS_BOARD_GAP, VERSUS_HEADER_HEIGHT
+        self.cell = max(8, min(BLOCK_SIZE,
+                               (max_size[0] - gap * (self.columns + 1)) // (self.columns * GRID_COLS),
+                               (max_size[1] - gap * (rows + 1) - header * rows) // (rows * GRID_ROWS)))
+        self.board_width = GRID_COLS * self.cell
+        self.board_height = GRID_ROWS * self.cell
+        self.size = (gap + self.columns * (self.board_width + gap),
+                     gap + rows * (header + self.board_height + gap))
+        self.origins = [(gap + (index % self.columns) * (self.board_width + gap),
+                         gap + (index // self.columns) * (header + self.board_height + gap) + header)
+                        for index in range(count)]
+
+        self.surface = self.pygame.Surface(self.size)
+        self.surface.fill(BLACK)
+        self.sprites = {} # board code -> pre-rendered cell Surface
+        self.colors = {code: TETROMINO_COLORS[name] for name, code in PIECE_IDS.items()}
+        self.colors[GARBAGE_ID] = GARBAGE_COLOR
+        if not self.pygame.font.get_init():
+            self.pygame.font.init()
+        self.font = self.pygame.font.Font(None, header)
+
+        self.last_board = [None] * count # Board bytes as last drawn
+        self.last_piece = [()] * count # (flat_index, code) of the active piece as last drawn
+        self.last_header = [None] * count
+
+    def sprite(self, code):
+        sprite = self.sprites.get(code)
+        if sprite is None:
+            sprite = self.pygame.Surface((self.cell, self.cell))
+            if code == 0:
+                sprite.fill(EMPTY_CELL_COLOR)
+                self.pygame.draw.rect(sprite, GRID_COLOR, (0, 0, self.cell, self.cell), 1)
+            else:
+                color = self.colors[code]
+                sprite.fill(color)
+                self.pygame.draw.rect(sprite, tuple(max(0, comp - 50) for comp in color), (0, 0, self.cell, self.cell), 1)
+            self.sprites[code] = sprite
+        return sprite
+
+    def piece_cells(self, game):
+        if game.game_over:
+            return ()
+        piece = game.current_piece
+        code = PIECE_IDS[piece.name]
+        return tuple((r * GRID_COLS + c, code) for r, c in piece.get_world_coords() if 0 <= r < GRID_ROWS)
+
+    def header_text(self, index, game, winner):
+        status = " WINNER" if index == winner else (" KO" if game.game_over else "")
+        return f"P{index + 1}  {game.score}  L{game.level}{status}"
+
+    def update(self, winner=None):
+        dirty = []
+        blit = self.surface.blit
+        for index, game in enumerate(self.games):
+            origin_x, origin_y = self.origins[index]
+            board = bytes(game.board)
+            piece = self.piece_cells(game)
+            last_board = self.last_board[index]
+
+            if board != last_board: # Lock, line clear or garbage: diff every cell (rare)
+                cells = {k for k in range(len(board)) if last_board is None or board[k] != last_board[k]}
+                cells.update(k for k, _ in self.last_piece[index])
+                cells.update(k for k, _ in piece)
+            elif piece != self.last_piece[index]: # Just the active piece moved
+                cells = {k for k, _ in self.last_piece[index]}
+                cells.update(k for k, _ in piece)
+            else:
+                cells = ()
+
+            if cells:
+                overlay = dict(piece)
+                for k in cells:
+                    blit(self.sprite(overlay.get(k, board[k])),
+                         (origin_x + (k % GRID_COLS) * self.cell, origin_y + (k // GRID_COLS) * self.cell))
+                rows = [k // GRID_COLS for k in cells]
+                cols = [k % GRID_COLS for k in cells]
+                dirty.append((origin_x + min(cols) * self.cell, origin_y + min(rows) * self.cell,
+                              (max(cols) - min(cols) + 1) * self.cell, (max(rows) - min(rows) + 1) * self.cell))
+                self.last_board[index] = board
+                self.last_piece[index] = piece
+
+            text = self.header_text(index, game, winner)
+            if text != self.last_header[index]:
+                header_rect = (origin_x, origin_y - VERSUS_HEADER_HEIGHT, self.board_width, VERSUS_HEADER_HEIGHT)
+                self.surface.fill(BLACK, header_rect)
+                blit(self.font.render(text, True, WHITE), (origin_x, origin_y - VERSUS_HEADER_HEIGHT + 4))
+                dirty.append(header_rect)
+                self.last_header[index] = text
+        return dirty
+
+
+def make_versus_window(match, compositor):
+    """Builds the Tk window lazily so headless benchmarks never import customtkinter."""
+    ctk = lazy_import("customtkinter")
+    tkinter = lazy_import("tkinter")
+
+    class VersusWindow(ctk.CTk):
+        """One Tk PhotoImage shows the shared surface; each frame only the dirty rectangles are copied in."""
+        def __init__(self):
+            super().__init__()
+            self.match = match
+            self.compositor = compositor
+            self.title(f"CTk Sharp Tetris - Versus ({len(match.games)} players)")
+            ctk.set_appearance_mode("Dark")
+            width, height = compositor.size
+            self.photo = tkinter.PhotoImage(width=width, height=height)
+            self.canvas = ctk.CTkCanvas(self, width=width, height=height, highlightthickness=0, bg="black")
+            self.canvas.pack()
+            self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+            self.bind("<KeyPress>", self.handle_keypress)
+            self.last_tick = time.perf_counter()
+            self.frame_id = None
+
+        def handle_keypress(self, event):
+            binding = KEY_BINDINGS.get(event.keysym.lower())
+            if binding:
+                self.match.apply_input(*binding) # Drawn with the next frame, not here
+
+        def push(self, rects):
+            pygame = self.compositor.pygame
+            for x, y, w, h in rects:
+                data = pygame.image.tostring(self.compositor.surface.subsurface((x, y, w, h)), "RGB")
+                patch = tkinter.PhotoImage(data=b"P6 %d %d 255\n" % (w, h) + data, format="PPM")
+                self.photo.tk.call(self.photo, "copy", patch, "-to", x, y)
+
+        def frame(self):
+            now = time.perf_counter()
+            elapsed_ms = min(250, (now - self.last_tick) * 1000) # Clamp after stalls (window drag etc.)
+            self.last_tick = now
+            self.match.tick(elapsed_ms)
+            winner = self.match.winner()
+            self.push(self.compositor.update(winner))
+            if self.match.finished():
+                print(f"Versus over, winner: P{winner + 1}" if winner is not None else "Versus over, draw")
+                return
+            self.frame_id = self.after(VERSUS_FRAME_MS, self.frame)
+
+        def start(self):
+            self.push([(0, 0) + tuple(self.compositor.size)]) # Background, gaps and first full board draw
+            self.frame_id = self.after(VERSUS_FRAME_MS, self.frame)
+            self.mainloop()
+
+    return VersusWindow()
+
+
+def benchmark(players, frames=600, seed=0):
+    """All-bot match composited offscreen; returns mean ms per frame (tick + composite + dirty copy)."""
+    match = VersusMatch(players, bots=players, seed=seed)
+    compositor = BoardCompositor(match.games)
+    compositor.update()
+    pygame = compositor.pygame
+    start = time.perf_counter()
+    for _ in range(frames):
+        match.tick(VERSUS_FRAME_MS)
+        for x, y, w, h in compositor.update(match.winner()):
+            pygame.image.tostring(compositor.surface.subsurface((x, y, w, h)), "RGB")
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local versus mode for 2-8 boards.")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--bots", type=int, help=f"Bot-controlled boards (default: all beyond {len(KEY_MAPS)} humans)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--benchmark", action="store_true", help="Print offscreen frame time for 2..8 all-bot boards")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        for players in range(2, VERSUS_MAX_PLAYERS + 1):
+            print(f"{players} boards: {benchmark(players):.3f} ms/frame")
+        return
+
+    bots = args.bots if args.bots is not None else max(0, args.players - len(KEY_MAPS))
+    if args.players - bots > len(KEY_MAPS):
+        parser.error(f"At most {len(KEY_MAPS)} keyboard players; use --bots for the other boards")
+    match = VersusMatch(args.players, bots=bots, seed=args.seed)
+    window = make_versus_window(match, BoardCompositor(match.games))
+    window.start()
+
+
+if __name__ == "__main__":
+    main()